@@ -0,0 +1,208 @@
+"""
+Content-hash embedding cache
+
+Re-running the notebook re-embeds every document, even when nothing changed.
+CachedEmbeddings wraps any LangChain embeddings model and remembers every vector
+under a key of (model, kind, content hash):
+
+- `kind` is "document" or "query": models like GoogleGenerativeAIEmbeddings embed
+  queries and documents differently, so they never share cache entries
+- lookups are done in bulk: the whole batch is hashed and checked first, and only
+  the misses (deduplicated) are sent to the model, `batch_size` texts per call
+- on disk the cache is two append-only binary files per model: 16-byte keys and
+  raw float32 (or float16) vectors. No JSON, no per-entry files; a 768-dim vector
+  costs 3 KB (1.5 KB as float16)
+
+    embeddings = CachedEmbeddings(GoogleGenerativeAIEmbeddings(model="models/embedding-001"),
+                                  model_name="models/embedding-001", path="embedding_cache")
+    vector_store = LocalVectorStore(embedding=embeddings, path="samad-raj-project")
+
+Re-ingesting a mostly unchanged corpus only pays for the changed documents.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+KEY_BYTES = 16
+
+
+def content_key(model_name: str, kind: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model_name}\0{kind}\0{text}".encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Key → vector map backed by append-only binary files (or memory only when path is None).
+    Thread-safe, so ingestion can embed several batches at once.
+    """
+
+    def __init__(self, path: str | os.PathLike | None, model_name: str, dtype: str = "float32"):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.dim: int | None = None
+        self._rows: dict[bytes, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=self.dtype)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.path: Path | None = None
+
+        if path is not None:
+            # One directory per model, so switching models never mixes vectors
+            slug = hashlib.blake2b(model_name.encode("utf-8"), digest_size=6).hexdigest()
+            self.path = Path(path) / slug
+            self.path.mkdir(parents=True, exist_ok=True)
+            if (self.path / "meta.json").exists():
+                self._load()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _load(self):
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.dim, self.dtype = meta["dim"], np.dtype(meta["dtype"])
+        keys = np.fromfile(self.path / "keys.bin", dtype=np.uint8)
+        vectors = np.fromfile(self.path / "vectors.bin", dtype=self.dtype)
+        # Vectors are written before keys, so a key on disk always has its vector;
+        # a torn tail (crash mid-write) is cut off here
+        count = min(len(keys) // KEY_BYTES, len(vectors) // self.dim)
+        keys = keys[: count * KEY_BYTES].reshape(count, KEY_BYTES)
+        self._vectors = vectors[: count * self.dim].reshape(count, self.dim).copy()
+        self._rows = {key.tobytes(): row for row, key in enumerate(keys)}
+        self._count = count
+
+    def get_many(self, keys: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, found mask): rows[i] is valid where found[i]."""
+        with self._lock:
+            rows = np.fromiter((self._rows.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+        return rows, rows >= 0
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        with self._lock:
+            return self._vectors[rows].astype(np.float32)
+
+    def put_many(self, keys: list[bytes], vectors: np.ndarray):
+        with self._lock:
+            self._put_locked(keys, np.asarray(vectors, dtype=self.dtype))
+
+    def _put_locked(self, keys: list[bytes], vectors: np.ndarray):
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._vectors = np.zeros((0, self.dim), dtype=self.dtype)
+            if self.path is not None:
+                meta = {"model": self.model_name, "dim": self.dim, "dtype": self.dtype.name}
+                (self.path / "meta.json").write_text(json.dumps(meta))
+
+        needed = self._count + len(keys)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors), 256), self.dim), dtype=self.dtype)
+            grown[: self._count] = self._vectors[: self._count]
+            self._vectors = grown
+        self._vectors[self._count:needed] = vectors
+        for offset, key in enumerate(keys):
+            self._rows[key] = self._count + offset
+        self._count = needed
+
+        if self.path is not None:
+            with open(self.path / "vectors.bin", "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.path / "keys.bin", "ab") as f:
+                f.write(b"".join(keys))
+
+
+class CachedEmbeddings:
+    """LangChain-compatible embeddings (embed_documents / embed_query) with a content-hash cache."""
+
+    def __init__(
+        self,
+        embeddings: Any,
+        model_name: str | None = None,
+        path: str | os.PathLike | None = "embedding_cache",
+        batch_size: int = 100,
+        dtype: str = "float32",
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(path, self.model_name, dtype)
+
+        # 📊 metrics
+        self.hits = 0
+        self.misses = 0
+        self.model_calls = 0
+
+    def _embed_misses(self, texts: list[str], kind: str) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            self.model_calls += 1
+            if kind == "query":
+                vectors.extend(self.embeddings.embed_query(text) for text in batch)
+            else:
+                vectors.extend(self.embeddings.embed_documents(batch))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def embed_many(self, texts: list[str], kind: str = "document") -> np.ndarray:
+        """(len(texts), dim) float32: cached rows first, one batched pass for the misses."""
+        if not texts:
+            return np.zeros((0, self.cache.dim or 0), dtype=np.float32)
+        keys = [content_key(self.model_name, kind, text) for text in texts]
+        rows, found = self.cache.get_many(keys)
+        self.hits += int(found.sum())
+
+        missing: dict[bytes, str] = {}  # dedupe: the same text twice is embedded once
+        for i in np.flatnonzero(~found):
+            missing.setdefault(keys[i], texts[i])
+        self.misses += len(missing)
+        if missing:
+            self.cache.put_many(list(missing), self._embed_misses(list(missing.values()), kind))
+            rows, found = self.cache.get_many(keys)
+        return self.cache.vectors(rows)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_many(list(texts), "document").tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_many([text], "query")[0].tolist()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self.cache), "hits": self.hits, "misses": self.misses,
+                "model_calls": self.model_calls, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# 🧪 Ingest the same corpus twice: python embedding_cache.py
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from local_vector_store import HashingEmbeddings, LocalVectorStore
+
+    class SlowEmbeddings(HashingEmbeddings):
+        """Stands in for an API model: 20 ms per call."""
+
+        def embed_documents(self, texts: list[str]) -> list[list[float]]:
+            time.sleep(0.02)
+            return super().embed_documents(texts)
+
+        def embed_query(self, text: str) -> list[float]:
+            time.sleep(0.02)
+            return super().embed_query(text)
+
+    corpus = [f"Document {i}: notes about topic {i % 97} and item {i}" for i in range(5000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for run, texts in enumerate([corpus, corpus[:4900] + [t + " (edited)" for t in corpus[4900:]]]):
+            embeddings = CachedEmbeddings(SlowEmbeddings(dim=384), "hashing-384", path=f"{tmp}/cache")
+            store = LocalVectorStore(embedding=embeddings)
+            started = time.perf_counter()
+            store.add_texts(texts, ids=[str(i) for i in range(len(texts))])
+            print(f"run {run + 1}: {time.perf_counter() - started:.2f}s {embeddings.stats()}")
+
+        size = sum(f.stat().st_size for f in Path(tmp, "cache").rglob("*"))
+        print(f"cache on disk: {size / 1e6:.1f} MB for {len(embeddings.cache)} vectors")
@@ -0,0 +1,449 @@
+"""
+Hybrid retrieval: BM25 keywords + vector similarity, fused with RRF
+
+Dense vectors capture meaning ("get my money back" ≈ "refund") but blur exact
+tokens: a ticket id like TCK-48213, a product name or an error code is just noise
+to an embedding model. BM25 is the opposite. HybridRetriever runs both on the same
+LocalVectorStore rows and merges the two rankings with reciprocal rank fusion:
+
+    score(doc) = Σ 1 / (rrf_k + rank of doc in each ranking)
+
+RRF only uses ranks, so BM25 scores and cosine similarities never need to be put
+on the same scale.
+
+- The BM25 inverted index is incremental: add / delete update only the affected
+  posting lists, no rebuild, and a batch of overwrites or deletes filters each
+  touched posting list once (not once per row). It is kept in memory and rebuilt
+  from the store's texts on startup (sync())
+- Metadata filters ({"source": "news"}) apply to both sides (MetadataIndex)
+- Every search records per-stage latency; evaluate() measures recall@k for
+  bm25 / vector / hybrid on labelled queries
+
+    retriever = HybridRetriever(vector_store)
+    retriever.add_documents(documents, ids=uuids)
+    retriever.search("TCK-48213 refund", k=4)
+    agent = Agent(name="Support", tools=[make_search_tool(retriever)], ...)
+"""
+
+import asyncio
+import math
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+import numpy as np
+
+from local_vector_store import Document, LocalVectorStore, _top_k
+
+MODES = ("hybrid", "bm25", "vector")
+
+# Ids like "TCK-48213" or "v1.2.3" stay one token (and are split into parts too)
+_TOKEN_RE = re.compile(r"\w+(?:[-./]\w+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token not in _STOPWORDS:
+            tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[-./]", token) if part and part not in _STOPWORDS)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[list[int]], rrf_k: int = 60) -> list[tuple[int, float]]:
+    """Fuse ranked row lists (best first) into one ranking of (row, RRF score)."""
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, 1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]  # nearest-rank
+
+
+# =============================================================================
+# BM25 inverted index
+# =============================================================================
+
+
+class BM25Index:
+    """Okapi BM25 over integer rows; posting lists are appended, frozen to arrays on read."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term → (rows, term frequencies)
+        self._postings: dict[str, tuple[list[int], list[int]] | tuple[np.ndarray, np.ndarray]] = {}
+        self._row_terms: dict[int, list[str]] = {}  # to remove a row on overwrite/delete
+        self._doc_len = np.zeros(1024, dtype=np.float32)
+        self._total_len = 0
+        self._size = 0  # highest indexed row + 1
+
+    def __len__(self) -> int:
+        return len(self._row_terms)
+
+    def add(self, row: int, text: str):
+        """Index a row (replaces whatever was indexed for it before)."""
+        self.add_many([row], [text])
+
+    def add_many(self, rows: Iterable[int], texts: Iterable[str]):
+        """Index many rows; rows indexed before are removed in one batch first."""
+        rows = list(rows)
+        self.remove_many([row for row in rows if row in self._row_terms])
+        for row, text in zip(rows, texts):
+            if row in self._row_terms:  # same row twice in one batch
+                self.remove_many([row])
+            self._add(row, text)
+
+    def _add(self, row: int, text: str):
+        tokens = tokenize(text)
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                self._postings[term] = ([row], [tf])
+            elif isinstance(posting[0], list):
+                posting[0].append(row)
+                posting[1].append(tf)
+            else:  # back to lists until the next read
+                self._postings[term] = ([*posting[0].tolist(), row], [*posting[1].tolist(), tf])
+
+        if row >= len(self._doc_len):
+            grown = np.zeros(max(row + 1, 2 * len(self._doc_len)), dtype=np.float32)
+            grown[: len(self._doc_len)] = self._doc_len
+            self._doc_len = grown
+        self._doc_len[row] = len(tokens)
+        self._total_len += len(tokens)
+        self._size = max(self._size, row + 1)
+        self._row_terms[row] = list(counts)
+
+    def remove(self, row: int):
+        self.remove_many([row])
+
+    def remove_many(self, rows: Iterable[int]):
+        """Unindex rows with one filtering pass per touched posting list (not one per row)."""
+        removed: dict[str, list[int]] = {}
+        for row in rows:
+            terms = self._row_terms.pop(row, None)
+            if terms is None:
+                continue
+            for term in terms:
+                removed.setdefault(term, []).append(row)
+            self._total_len -= int(self._doc_len[row])
+            self._doc_len[row] = 0
+        for term, gone in removed.items():
+            posting_rows, tfs = self._posting(term)
+            keep = posting_rows != gone[0] if len(gone) == 1 else ~np.isin(posting_rows, gone)
+            if keep.any():
+                self._postings[term] = (posting_rows[keep], tfs[keep])
+            else:
+                del self._postings[term]
+
+    def _posting(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        posting = self._postings.get(term)
+        if posting is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if isinstance(posting[0], list):
+            rows = np.asarray(posting[0], dtype=np.int64)
+            tfs = np.asarray(posting[1], dtype=np.float32)
+            posting = (rows, tfs)
+            self._postings[term] = posting
+        return posting
+
+    def search(self, query: str, k: int = 10, rows: np.ndarray | None = None) -> list[tuple[int, float]]:
+        """(row, BM25 score) pairs, best first; `rows` restricts the search (e.g. a metadata filter)."""
+        terms = set(tokenize(query))
+        if not terms or not self._row_terms:
+            return []
+        n = len(self._row_terms)
+        avg_len = self._total_len / n or 1.0
+        scores = np.zeros(self._size, dtype=np.float32)
+        for term in terms:
+            posting_rows, tfs = self._posting(term)
+            if posting_rows.size == 0:
+                continue
+            idf = math.log(1 + (n - posting_rows.size + 0.5) / (posting_rows.size + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len[posting_rows] / avg_len)
+            scores[posting_rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        scores[scores <= 0] = -np.inf  # rows without any query term are not results
+        if rows is not None:
+            allowed = np.zeros(self._size, dtype=bool)
+            allowed[rows[rows < self._size]] = True
+            scores[~allowed] = -np.inf
+        return [(int(row), float(scores[row])) for row in _top_k(scores, k)]
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+
+@dataclass
+class RetrievalMetrics:
+    """Rolling latency windows per stage (ms), plus how much text the tool returned."""
+
+    window: int = 1000
+    searches: int = 0
+    latencies: dict[str, deque] = field(default_factory=dict)
+    tool_calls: int = 0
+    tool_chars: int = 0
+
+    def record(self, stage: str, ms: float):
+        self.latencies.setdefault(stage, deque(maxlen=self.window)).append(ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {"searches": self.searches}
+        for stage, values in self.latencies.items():
+            stats[f"{stage}_p50_ms"] = round(percentile(values, 50), 3)
+            stats[f"{stage}_p95_ms"] = round(percentile(values, 95), 3)
+        if self.tool_calls:
+            stats["tool_calls"] = self.tool_calls
+            stats["avg_tool_chars"] = self.tool_chars // self.tool_calls
+        return stats
+
+
+# =============================================================================
+# Hybrid retriever
+# =============================================================================
+
+
+class HybridRetriever:
+    def __init__(self, store: LocalVectorStore, rrf_k: int = 60, candidates: int = 50,
+                 bm25: BM25Index | None = None):
+        self.store = store
+        self.rrf_k = rrf_k
+        self.candidates = candidates  # rows taken from each ranking before fusion
+        self.bm25 = bm25 or BM25Index()
+        self.metrics = RetrievalMetrics()
+        self._indexed: dict[int, str] = {}  # row → the text object BM25 indexed for it
+        self._lock = threading.Lock()  # the tool searches from worker threads
+        self.sync()
+
+    def _index(self, rows: Iterable[int]):
+        rows = list(rows)
+        texts = [self.store._texts[row] for row in rows]
+        self.bm25.add_many(rows, texts)
+        self._indexed.update(zip(rows, texts))
+
+    def sync(self) -> int:
+        """Bring BM25 up to date with rows written to the store directly (ingest(), reload)."""
+        with self._lock:
+            stale = [row for row in self._indexed if not self.store._alive[row]]
+            self.bm25.remove_many(stale)
+            for row in stale:
+                del self._indexed[row]
+            alive = np.flatnonzero(self.store._alive[: self.store._count])
+            # add_texts keeps the caller's str objects, so an identity check finds overwrites
+            changed = [int(row) for row in alive if self._indexed.get(row) is not self.store._texts[row]]
+            self._index(changed)
+        return len(stale) + len(changed)
+
+    def add_texts(self, texts: Iterable[str], metadatas: list[dict[str, Any]] | None = None,
+                  ids: list[str] | None = None, **kwargs: Any) -> list[str]:
+        with self._lock:
+            ids = self.store.add_texts(texts, metadatas, ids, **kwargs)
+            self._index(self.store._rows[doc_id] for doc_id in ids)
+        return ids
+
+    def add_documents(self, documents: list[Document], ids: list[str] | None = None, **kwargs: Any) -> list[str]:
+        if ids is None:
+            ids = [getattr(doc, "id", None) or str(uuid.uuid4()) for doc in documents]
+        return self.add_texts([doc.page_content for doc in documents],
+                              [dict(doc.metadata) for doc in documents], ids=ids, **kwargs)
+
+    def delete(self, ids: list[str]) -> bool:
+        with self._lock:
+            rows = [self.store._rows[doc_id] for doc_id in ids if doc_id in self.store._rows]
+            self.bm25.remove_many(rows)
+            for row in rows:
+                self._indexed.pop(row, None)
+            return self.store.delete(ids)
+
+    def search_rows(self, query: str, k: int = 4, filter: dict[str, Any] | None = None,
+                    mode: str = "hybrid") -> list[tuple[int, float]]:
+        """(row, score) pairs; the score is BM25, cosine or RRF depending on `mode`."""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        started = time.perf_counter()
+        depth = max(k, self.candidates) if mode == "hybrid" else k
+
+        vector = None
+        if mode != "bm25":
+            # Outside the lock: with an API embedding model this is the slow, I/O-bound part
+            vector = self.store.embedding.embed_query(query)
+            self.metrics.record("embed", (time.perf_counter() - started) * 1000)
+
+        with self._lock:
+            lexical: list[tuple[int, float]] = []
+            if mode != "vector":
+                t = time.perf_counter()
+                rows = self.store._meta_index.lookup(filter) if filter else None
+                lexical = self.bm25.search(query, depth, rows)
+                self.metrics.record("bm25", (time.perf_counter() - t) * 1000)
+
+            dense: list[tuple[int, float]] = []
+            if vector is not None:
+                t = time.perf_counter()
+                dense = self.store.search_vector(vector, depth, filter)
+                self.metrics.record("vector", (time.perf_counter() - t) * 1000)
+
+        if mode == "hybrid":
+            results = reciprocal_rank_fusion([[row for row, _ in lexical], [row for row, _ in dense]],
+                                             self.rrf_k)[:k]
+        else:
+            results = lexical or dense
+        self.metrics.searches += 1
+        self.metrics.record(mode, (time.perf_counter() - started) * 1000)
+        return results
+
+    def search(self, query: str, k: int = 4, filter: dict[str, Any] | None = None,
+               mode: str = "hybrid") -> list[tuple[Document, float]]:
+        return [(self.store._document(row), score) for row, score in self.search_rows(query, k, filter, mode)]
+
+    def evaluate(self, labelled: list[tuple[str, set[str]]], k: int = 5,
+                 modes: Iterable[str] = MODES) -> dict[str, dict[str, float]]:
+        """recall@k and latency per mode on (query, relevant ids) pairs."""
+        report = {}
+        for mode in modes:
+            recalls, latencies = [], []
+            for query, relevant in labelled:
+                started = time.perf_counter()
+                rows = self.search_rows(query, k, mode=mode)
+                latencies.append((time.perf_counter() - started) * 1000)
+                found = {self.store._ids[row] for row, _ in rows}
+                recalls.append(len(found & relevant) / len(relevant) if relevant else 1.0)
+            report[mode] = {f"recall@{k}": float(np.mean(recalls)),
+                            "p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95)}
+        return report
+
+
+# =============================================================================
+# Agent tool
+# =============================================================================
+
+
+def make_search_tool(retriever: HybridRetriever, k: int = 4, max_chars: int = 800,
+                     name: str = "search_knowledge_base"):
+    """
+    @function_tool for the Agents SDK. It returns k short, numbered chunks: better
+    first-stage recall means fewer chunks are needed, which keeps prompts small.
+    """
+    from agents import function_tool  # only needed when an agent actually uses the tool
+
+    @function_tool(name_override=name)
+    async def search_knowledge_base(query: str, source: str | None = None) -> str:
+        """
+        Search the knowledge base by keywords and meaning. Exact names, ids and error codes work.
+
+        Args:
+            query: What to look for; include exact names, ids or codes when you know them.
+            source: Only search chunks whose metadata "source" equals this value.
+        """
+        filter = {"source": source} if source else None
+        results = await asyncio.to_thread(retriever.search, query, k, filter)
+        lines = []
+        for number, (doc, _) in enumerate(results, 1):
+            text = doc.page_content if len(doc.page_content) <= max_chars else doc.page_content[:max_chars] + "…"
+            origin = doc.metadata.get("source")
+            lines.append(f"[{number}] id={doc.id}" + (f" source={origin}" if origin else "") + f"\n{text}")
+        answer = "\n\n".join(lines) or "No matching chunks."
+        retriever.metrics.tool_calls += 1
+        retriever.metrics.tool_chars += len(answer)
+        return answer
+
+    return search_knowledge_base
+
+
+# 🧪 Recall and latency, bm25 vs vector vs hybrid: python hybrid_retriever.py
+if __name__ == "__main__":
+    import zlib
+
+    rng = np.random.default_rng(7)
+    n_topics, docs_per_topic, dim = 2000, 5, 128
+    syllables = [a + b for a in "bcdfgklmnprstvz" for b in "aeiou"]
+
+    def word() -> str:
+        return "".join(rng.choice(syllables, size=3))
+
+    # Each topic has words used in documents and different words ("synonyms") used in queries
+    topic_words = [(word(), word()) for _ in range(n_topics)]
+    query_words = [(word(), word()) for _ in range(n_topics)]
+    filler = [word() for _ in range(300)]
+    centroids = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    word_topic = {w: t for t in range(n_topics) for w in (*topic_words[t], *query_words[t])}
+
+    class TopicEmbeddings:
+        """Stands in for a dense model: it knows what a text is about (topic words and their
+        synonyms) but, like real embeddings, is blind to exact identifiers."""
+
+        def embed_query(self, text: str) -> list[float]:
+            noise = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(dim).astype(np.float32)
+            topics = [word_topic[w] for w in tokenize(text) if w in word_topic]
+            vector = 0.35 * noise + (centroids[topics[0]] if topics else 0)
+            return vector.tolist()
+
+        def embed_documents(self, texts: list[str]) -> list[list[float]]:
+            return [self.embed_query(text) for text in texts]
+
+    texts, ids, metadatas, tickets = [], [], [], []
+    for t in range(n_topics):
+        for _ in range(docs_per_topic):
+            ticket = f"TCK-{len(ids):05d}"
+            words = [*topic_words[t], *rng.choice(filler, size=12)]
+            rng.shuffle(words)
+            texts.append(f"Ticket {ticket}: " + " ".join(words))
+            ids.append(ticket)
+            metadatas.append({"source": "tickets", "topic": t})
+            tickets.append((ticket, t))
+
+    started = time.perf_counter()
+    retriever = HybridRetriever(LocalVectorStore(embedding=TopicEmbeddings()))
+    for start in range(0, len(texts), 1000):
+        retriever.add_texts(texts[start:start + 1000], metadatas[start:start + 1000], ids[start:start + 1000])
+    print(f"indexed {len(retriever.bm25)} chunks (vectors + BM25) in {time.perf_counter() - started:.2f}s")
+
+    picks = rng.choice(len(tickets), size=200, replace=False)
+    by_id = [(f"what is the status of {tickets[i][0]}", {tickets[i][0]}) for i in picks]
+    by_meaning = [(" ".join(query_words[tickets[i][1]]),
+                   {f"TCK-{tickets[i][1] * docs_per_topic + j:05d}" for j in range(docs_per_topic)}) for i in picks]
+    mixed = [(f"{tickets[i][0]} " + " ".join(query_words[tickets[i][1]]), {tickets[i][0]}) for i in picks]
+
+    for label, labelled in (("exact id", by_id), ("paraphrase", by_meaning), ("id + paraphrase", mixed),
+                            ("all queries", by_id + by_meaning + mixed)):
+        print(f"{label}:")
+        for mode, row in retriever.evaluate(labelled, k=5).items():
+            print(f"  {mode:>6}: recall@5 {row['recall@5']:.3f}  p50 {row['p50_ms']:.2f} ms  p95 {row['p95_ms']:.2f} ms")
+
+    # Incremental updates: no rebuild, the next query already sees them
+    retriever.add_texts(["Ticket TCK-99999: printer on fire"], [{"source": "tickets"}], ["TCK-99999"])
+    assert retriever.search("TCK-99999", k=1)[0][0].id == "TCK-99999"
+    retriever.delete(["TCK-99999"])
+    assert all(doc.id != "TCK-99999" for doc, _ in retriever.search("TCK-99999 printer fire", k=5))
+
+    # Re-ingest every chunk straight into the store, then sync(): one batched BM25 overwrite
+    for start in range(0, len(texts), 1000):
+        retriever.store.add_texts([text + " " for text in texts[start:start + 1000]],
+                                  metadatas[start:start + 1000], ids[start:start + 1000])
+    started = time.perf_counter()
+    changed = retriever.sync()
+    elapsed = time.perf_counter() - started
+    assert changed == len(texts) and len(retriever.bm25) == len(texts)
+    assert retriever.search("TCK-00042", k=1, mode="bm25")[0][0].id == "TCK-00042"
+    print(f"sync after re-ingest: {changed} chunks in {elapsed:.2f}s ({elapsed / changed * 1000:.3f} ms per overwrite)")
+    print({key: value for key, value in retriever.metrics.as_dict().items() if "p50" in key or key == "searches"})
@@ -0,0 +1,285 @@
+"""
+Streaming RAG ingestion pipeline
+
+The notebook builds every Document by hand and calls add_documents() once. That
+needs the whole corpus in memory and gives no progress. Here ingestion is a chain of
+generator stages; each pulls from the previous one, so only a few batches are in
+memory at any time, however large the corpus:
+
+    load_text_files / load_jsonl   → Documents, one at a time
+    chunk_documents                → overlapping chunks (split at paragraph, sentence
+                                     or word boundaries near the chunk end)
+    batched                        → lists of `batch_size` chunks
+    embed_batches                  → (chunks, vectors); up to `concurrency` batches are
+                                     embedded at once in worker threads, results in order
+    upsert_batches                 → vector_store.add_texts(..., vectors=...)
+
+Chunk ids are stable ("<document id>:<chunk number>"), so re-ingesting updates chunks
+in place; with CachedEmbeddings unchanged chunks are not even re-embedded. When a
+document now has fewer chunks, its chunks past the new count are deleted (found by
+their "doc_id" metadata). Documents without an id get one from a hash of their
+content, so re-ingesting them doesn't duplicate them (but an edited one is new).
+
+    stats = ingest(load_text_files("docs/"), vector_store, embeddings, on_progress=print)
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+import numpy as np
+
+from local_vector_store import Document
+
+T = TypeVar("T")
+
+
+@dataclass
+class IngestionStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    documents: int = 0
+    chunks: int = 0
+    stale_chunks: int = 0  # deleted because their document got shorter
+    chars: int = 0
+    batches: int = 0
+    embed_seconds: float = 0.0  # summed over worker threads
+    upsert_seconds: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def __str__(self) -> str:
+        rate = self.chunks / self.elapsed if self.elapsed else 0.0
+        return (f"{self.documents} docs → {self.chunks} chunks in {self.batches} batches, "
+                f"{self.elapsed:.1f}s ({rate:.0f} chunks/s, embed {self.embed_seconds:.1f}s across workers, "
+                f"upsert {self.upsert_seconds:.1f}s)"
+                + (f", {self.stale_chunks} stale chunks deleted" if self.stale_chunks else ""))
+
+
+# =============================================================================
+# Stages
+# =============================================================================
+
+
+def load_text_files(root: str | os.PathLike, pattern: str = "**/*.txt") -> Iterator[Document]:
+    """One Document per file, read lazily; metadata has the source path."""
+    for path in sorted(Path(root).glob(pattern)):
+        if path.is_file():
+            yield Document(page_content=path.read_text(encoding="utf-8", errors="replace"),
+                           metadata={"source": str(path)}, id=str(path))
+
+
+def load_jsonl(path: str | os.PathLike) -> Iterator[Document]:
+    """Lines like {"id": ..., "page_content" (or "text"): ..., "metadata": {...}}."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield Document(page_content=record.get("page_content", record.get("text", "")),
+                           metadata=record.get("metadata", {}), id=str(record.get("id", number)))
+
+
+_SEPARATORS = ("\n\n", "\n", ". ", "? ", "! ", " ")
+
+
+def split_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> list[str]:
+    """Windows of at most `chunk_size` chars; each starts `overlap` chars before the previous end."""
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+    chunks: list[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Prefer a natural boundary in the second half of the window
+            for separator in _SEPARATORS:
+                cut = text.rfind(separator, start + chunk_size // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+        # Don't start the overlap mid-word
+        space = text.find(" ", start, end)
+        if space != -1 and space - start < overlap // 2:
+            start = space + 1
+    return chunks
+
+
+def document_id(document: Document) -> str:
+    """The document's own id, or a content hash (stable across runs, unlike position or id())."""
+    return getattr(document, "id", None) or hashlib.blake2b(
+        document.page_content.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def chunk_documents(documents: Iterable[Document], chunk_size: int = 1000, overlap: int = 200,
+                    stats: IngestionStats | None = None,
+                    on_document: Callable[[str, int], None] | None = None) -> Iterator[Document]:
+    """Chunks with ids "<doc_id>:<n>"; `on_document(doc_id, chunk count)` runs before a document's chunks."""
+    for document in documents:
+        if stats is not None:
+            stats.documents += 1
+        doc_id = document_id(document)
+        chunks = split_text(document.page_content, chunk_size, overlap)
+        if on_document is not None:
+            on_document(doc_id, len(chunks))
+        for number, chunk in enumerate(chunks):
+            yield Document(page_content=chunk, metadata={**document.metadata, "chunk": number, "doc_id": doc_id},
+                           id=f"{doc_id}:{number}")
+
+
+def delete_stale_chunks(vector_store: Any, doc_id: str, count: int) -> int:
+    """Delete the document's stored chunks numbered `count` or higher (left over from a longer version)."""
+    current = {f"{doc_id}:{number}" for number in range(count)}
+    stale = [chunk_id for chunk_id in vector_store.get_ids({"doc_id": doc_id}) if chunk_id not in current]
+    if stale:
+        vector_store.delete(stale)
+    return len(stale)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    batch: list[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_batches(batches: Iterable[list[Document]], embeddings: Any, concurrency: int = 4,
+                  stats: IngestionStats | None = None) -> Iterator[tuple[list[Document], np.ndarray]]:
+    """Embed up to `concurrency` batches at once (threads: API calls are I/O bound), yielding in order."""
+
+    def embed(batch: list[Document]) -> tuple[list[Document], np.ndarray, float]:
+        started = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents([doc.page_content for doc in batch]), dtype=np.float32)
+        return batch, vectors, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight: list[Future] = []
+        for batch in batches:
+            in_flight.append(pool.submit(embed, batch))
+            if len(in_flight) >= concurrency:  # bounded: never read further ahead than this
+                yield _collect(in_flight.pop(0), stats)
+        while in_flight:
+            yield _collect(in_flight.pop(0), stats)
+
+
+def _collect(future: Future, stats: IngestionStats | None) -> tuple[list[Document], np.ndarray]:
+    batch, vectors, seconds = future.result()
+    if stats is not None:
+        stats.embed_seconds += seconds
+    return batch, vectors
+
+
+def upsert_batches(embedded: Iterable[tuple[list[Document], np.ndarray]], vector_store: Any,
+                   stats: IngestionStats | None = None,
+                   on_progress: Callable[[IngestionStats], None] | None = None,
+                   flush_every: int = 50) -> Iterator[list[str]]:
+    """Upsert each batch; the store is flushed every `flush_every` batches instead of every batch."""
+    for count, (batch, vectors) in enumerate(embedded, 1):
+        started = time.perf_counter()
+        ids = vector_store.add_texts([doc.page_content for doc in batch], [doc.metadata for doc in batch],
+                                     ids=[doc.id for doc in batch], vectors=vectors, flush=False)
+        if count % flush_every == 0:
+            vector_store.flush()
+        if stats is not None:
+            stats.upsert_seconds += time.perf_counter() - started
+            stats.batches += 1
+            stats.chunks += len(batch)
+            stats.chars += sum(len(doc.page_content) for doc in batch)
+            if on_progress is not None:
+                on_progress(stats)
+        yield ids
+    vector_store.flush()
+
+
+def ingest(
+    documents: Iterable[Document],
+    vector_store: Any,
+    embeddings: Any,
+    chunk_size: int = 1000,
+    overlap: int = 200,
+    batch_size: int = 64,
+    concurrency: int = 4,
+    on_progress: Callable[[IngestionStats], None] | None = None,
+) -> IngestionStats:
+    """Run the whole pipeline; memory stays around `concurrency * batch_size` chunks."""
+    stats = IngestionStats()
+
+    def prune(doc_id: str, count: int):
+        stats.stale_chunks += delete_stale_chunks(vector_store, doc_id, count)
+
+    # Stores without a metadata id lookup (get_ids) can't tell which old chunks exist
+    on_document = prune if hasattr(vector_store, "get_ids") else None
+    chunks = chunk_documents(documents, chunk_size, overlap, stats, on_document)
+    embedded = embed_batches(batched(chunks, batch_size), embeddings, concurrency, stats)
+    for _ in upsert_batches(embedded, vector_store, stats, on_progress):
+        pass
+    return stats
+
+
+# 🧪 Ingest a generated corpus from disk: python ingestion.py
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import tracemalloc
+
+    from local_vector_store import LocalVectorStore
+
+    class ApiLikeEmbeddings:
+        """50 ms per call, like a remote embedding API (vectors are seeded by the text)."""
+
+        def __init__(self, dim: int):
+            self.dim = dim
+
+        def embed_documents(self, texts: list[str]) -> list[list[float]]:
+            time.sleep(0.05)
+            return [np.random.default_rng(abs(hash(text))).standard_normal(self.dim).tolist() for text in texts]
+
+        def embed_query(self, text: str) -> list[float]:
+            return self.embed_documents([text])[0]
+
+    words = "agent tool model vector index query answer chunk token retrieval memory stream".split()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(300):
+            sentences = (" ".join(rng.choices(words, k=rng.randint(6, 18))).capitalize() + "." for _ in range(120))
+            Path(tmp, f"doc_{i:04d}.txt").write_text(" ".join(sentences))
+
+        store = LocalVectorStore(embedding=ApiLikeEmbeddings(dim=256), path=Path(tmp, "store"))
+        tracemalloc.start()
+        progress = lambda s: print(f"  {s}") if s.batches % 40 == 0 else None
+        for concurrency in (1, 8):
+            stats = ingest(load_text_files(tmp), store, store.embedding, batch_size=32,
+                           concurrency=concurrency, on_progress=progress)
+            print(f"concurrency={concurrency}: {stats}")
+        print(f"peak traced memory: {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB, "
+              f"store has {len(store)} chunks (second run updated them in place)")
+
+        # A document that got shorter loses its extra chunks; id-less documents don't duplicate
+        before = len(store)
+        long_id = str(Path(tmp, "doc_0000.txt"))
+        old_count = len(store.get_ids({"doc_id": long_id}))
+        stats = ingest([Document(page_content="short text", metadata={}, id=long_id)], store, store.embedding)
+        assert store.get_ids({"doc_id": long_id}) == [f"{long_id}:0"] and stats.stale_chunks == old_count - 1
+        assert all(doc.metadata["doc_id"] != long_id or doc.page_content == "short text"
+                   for doc in store.similarity_search(" ".join(words), k=50))
+        for _ in range(2):
+            ingest([Document(page_content="no id here", metadata={})], store, store.embedding)
+        assert len(store) == before - old_count + 2, len(store)
+        print(f"shrunk document: {stats.stale_chunks} stale chunks deleted; id-less re-ingest: no duplicates")
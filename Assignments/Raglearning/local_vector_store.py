@@ -0,0 +1,560 @@
+"""
+Local vector store (offline stand-in for PineconeVectorStore)
+
+Same surface as the LangChain vector store used in Ragprojectpinecon.ipynb:
+
+    vector_store = LocalVectorStore(embedding=embeddings, path="samad-raj-project")
+    vector_store.add_documents(documents=documents, ids=uuids)
+    vector_store.similarity_search("LangChain provides abstractions", k=2, filter={"source": "tweet"})
+
+How it works
+- Vectors are L2-normalized (cosine metric, like the Pinecone index) and kept in ONE
+  contiguous float32 matrix; with `path` that matrix is a memory-mapped file, so a
+  store larger than RAM is paged in by the OS and reopens instantly
+- Documents (text + metadata) go to an append-only JSONL log next to it
+- Exact search: one matrix-vector product + top-k selection over all rows
+- Filters ({"source": "news"}, Pinecone syntax) are resolved BEFORE scoring by an
+  inverted metadata index, so only matching rows are scored
+- IVF search (`build_ivf()`): k-means centroids split the rows into `nlist` lists;
+  a query only scores the rows of its `nprobe` closest lists. Much faster on large
+  corpora, at a small recall cost (see the benchmark)
+
+Without an embedding model, HashingEmbeddings gives local vectors (no API calls).
+
+🧪 Benchmark: python local_vector_store.py --n 200000 --dim 256 --nlist 512 --nprobe 8 16 32
+"""
+
+import hashlib
+import json
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Protocol
+
+import numpy as np
+
+from metadata_index import MetadataIndex
+
+try:
+    from langchain_core.documents import Document
+except ImportError:  # offline use without LangChain installed
+
+    @dataclass
+    class Document:
+        page_content: str
+        metadata: dict[str, Any] = field(default_factory=dict)
+        id: str | None = None
+
+
+class Embeddings(Protocol):
+    """LangChain's embeddings interface (GoogleGenerativeAIEmbeddings, OpenAIEmbeddings, ...)."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]: ...
+
+    def embed_query(self, text: str) -> list[float]: ...
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddings:
+    """
+    Local embeddings: words and character trigrams hashed into `dim` signed buckets.
+
+    The same code as HashingEmbedder in decodingopenaisdk/vector_memory.py (that folder
+    can't be imported from here, so change both together), plus LangChain's
+    embed_documents / embed_query.
+    """
+
+    def __init__(self, dim: int = 384, char_ngram: int = 3):
+        self.dim = dim
+        self.char_ngram = char_ngram
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        n = self.char_ngram
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed([text])[0].tolist()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (-inf scores dropped)."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.size)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return top[np.isfinite(scores[top])]
+
+
+# =============================================================================
+# Vector store
+# =============================================================================
+
+
+class LocalVectorStore:
+    VERSION = 1
+
+    def __init__(
+        self,
+        embedding: Embeddings | None = None,
+        path: str | os.PathLike | None = None,
+        initial_capacity: int = 1024,
+        nprobe: int = 8,
+        dense_filter_ratio: float = 0.3,
+    ):
+        self.embedding = embedding or HashingEmbeddings()
+        self.path = Path(path) if path is not None else None
+        self.nprobe = nprobe
+        # Exact search with a filter matching more than this share of rows scans everything
+        # with a mask instead of gathering the matching rows (the gather copy costs more)
+        self.dense_filter_ratio = dense_filter_ratio
+
+        self.dim: int | None = None
+        self._capacity = initial_capacity
+        self._vectors: np.ndarray | None = None  # (capacity, dim) float32, memmap when persisted
+        self._count = 0
+        self._alive = np.zeros(initial_capacity, dtype=bool)
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadatas: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._meta_index = MetadataIndex()
+
+        # IVF index (None until build_ivf())
+        self._centroids: np.ndarray | None = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._lists: list[np.ndarray] = []
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if (self.path / "meta.json").exists():
+                self._load()
+
+    def __len__(self) -> int:
+        return int(self._alive[: self._count].sum())
+
+    # ----- storage -----
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if self.path is None:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        else:
+            tmp = self.path / "vectors.f32.tmp"
+            matrix = np.memmap(tmp, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        if self._vectors is not None:
+            matrix[: self._count] = self._vectors[: self._count]
+        if self.path is not None:
+            matrix.flush()
+            del matrix
+            os.replace(self.path / "vectors.f32.tmp", self.path / "vectors.f32")
+            matrix = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        return matrix
+
+    def _ensure_capacity(self, extra: int):
+        needed = self._count + extra
+        if self._vectors is not None and needed <= self._capacity:
+            return
+        if self._vectors is not None:
+            self._capacity = max(needed, self._capacity * 2)
+        else:
+            self._capacity = max(needed, self._capacity)
+        self._vectors = self._allocate(self._capacity)
+        alive = np.zeros(self._capacity, dtype=bool)
+        alive[: self._count] = self._alive[: self._count]
+        self._alive = alive
+
+    def _log(self, entries: list[dict[str, Any]]):
+        if self.path is None:
+            return
+        with open(self.path / "docs.jsonl", "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+
+    def _write_meta(self):
+        if self.path is None:
+            return
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        meta = {"version": self.VERSION, "dim": self.dim, "count": self._count, "capacity": self._capacity}
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    def _load(self):
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.dim, self._capacity = meta["dim"], meta["capacity"]
+        self._vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r+",
+                                  shape=(self._capacity, self.dim))
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        with open(self.path / "docs.jsonl", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line after a crash
+                if "delete" in entry:
+                    row = self._rows.pop(entry["delete"], None)
+                    if row is not None:
+                        self._alive[row] = False
+                    continue
+                row = entry["row"]
+                if row >= meta["count"]:
+                    continue  # vectors of this batch were never flushed (later deletes still apply)
+                if row == len(self._ids):
+                    self._ids.append(entry["id"])
+                    self._texts.append(entry["text"])
+                    self._metadatas.append(entry["metadata"])
+                else:
+                    self._ids[row], self._texts[row], self._metadatas[row] = entry["id"], entry["text"], entry["metadata"]
+                self._rows[entry["id"]] = row
+                self._alive[row] = True
+        self._count = len(self._ids)
+        alive = np.flatnonzero(self._alive[: self._count])
+        self._meta_index.add_many(alive.tolist(), (self._metadatas[row] for row in alive))
+
+        if (self.path / "centroids.npy").exists():
+            self._centroids = np.load(self.path / "centroids.npy")
+            assign = np.load(self.path / "assign.npy") if (self.path / "assign.npy").exists() else np.zeros(0, np.int32)
+            self._assign = np.full(self._count, -1, dtype=np.int32)
+            self._assign[: len(assign)] = assign[: self._count]
+            tail = np.arange(len(assign), self._count)
+            if tail.size:
+                self._assign[tail] = self._nearest_centroids(self._vectors[tail])
+            self._rebuild_lists()
+
+    def flush(self):
+        """Make everything added so far durable (vectors, metadata, IVF assignments)."""
+        self._write_meta()
+        if self.path is not None and self._centroids is not None:
+            np.save(self.path / "centroids.npy", self._centroids)
+            np.save(self.path / "assign.npy", self._assign[: self._count])
+
+    # ----- writes -----
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict[str, Any]] | None = None,
+        ids: list[str] | None = None,
+        vectors: np.ndarray | list[list[float]] | None = None,
+        flush: bool = True,
+    ) -> list[str]:
+        """
+        Embed (unless `vectors` are given) and upsert texts; an existing id is overwritten.
+        flush=False leaves making the batch durable to a later flush() (bulk loads).
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        if vectors is None:
+            vectors = self.embedding.embed_documents(texts)
+        matrix = _normalize(vectors)
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        if matrix.shape != (len(texts), self.dim):
+            raise ValueError(f"Expected vectors of shape ({len(texts)}, {self.dim}), got {matrix.shape}")
+
+        rows = np.empty(len(texts), dtype=np.int64)
+        new = [i for i, doc_id in enumerate(ids) if doc_id not in self._rows]
+        self._ensure_capacity(len(new))
+        for i, doc_id in enumerate(ids):
+            row = self._rows.get(doc_id)
+            if row is None:
+                row = self._count
+                self._count += 1
+                self._ids.append(doc_id)
+                self._texts.append(texts[i])
+                self._metadatas.append(metadatas[i])
+                self._rows[doc_id] = row
+            else:
+                self._texts[row], self._metadatas[row] = texts[i], metadatas[i]
+            rows[i] = row
+        self._vectors[rows] = matrix
+        self._alive[rows] = True
+        self._meta_index.add_many(rows.tolist(), metadatas)
+        self._on_upsert(rows)
+
+        self._log([{"id": ids[i], "row": int(rows[i]), "text": texts[i], "metadata": metadatas[i]}
+                   for i in range(len(texts))])
+        if flush:
+            self._write_meta()
+        return ids
+
+    def add_documents(self, documents: list[Document], ids: list[str] | None = None, **kwargs: Any) -> list[str]:
+        if ids is None:
+            ids = [getattr(doc, "id", None) or str(uuid.uuid4()) for doc in documents]
+        return self.add_texts([doc.page_content for doc in documents],
+                              [dict(doc.metadata) for doc in documents], ids=ids, **kwargs)
+
+    def delete(self, ids: list[str]) -> bool:
+        removed, rows = [], []
+        for doc_id in ids:
+            row = self._rows.pop(doc_id, None)
+            if row is not None:
+                self._alive[row] = False
+                rows.append(row)
+                removed.append({"delete": doc_id})
+        self._meta_index.remove_many(rows)
+        self._log(removed)
+        return bool(removed)
+
+    def get_by_ids(self, ids: list[str]) -> list[Document]:
+        return [self._document(self._rows[doc_id]) for doc_id in ids if doc_id in self._rows]
+
+    def get_ids(self, filter: dict[str, Any]) -> list[str]:
+        """Ids of the stored documents whose metadata matches `filter` (index lookup, no scan)."""
+        return [self._ids[row] for row in self._meta_index.lookup(filter).tolist()]
+
+    def _on_upsert(self, rows: np.ndarray):
+        """Keep the IVF lists in sync with new or overwritten rows."""
+        if self._centroids is None:
+            return
+        if len(self._assign) < self._capacity:
+            grown = np.full(self._capacity, -1, dtype=np.int32)
+            grown[: len(self._assign)] = self._assign
+            self._assign = grown
+        old = self._assign[rows]
+        new = self._nearest_centroids(self._vectors[rows])
+        self._assign[rows] = new
+        moved = old != new
+        for list_id in np.unique(old[moved & (old >= 0)]):
+            self._lists[list_id] = self._lists[list_id][~np.isin(self._lists[list_id], rows[moved & (old == list_id)])]
+        for list_id in np.unique(new[moved]):
+            self._lists[list_id] = np.concatenate([self._lists[list_id], rows[moved & (new == list_id)]])
+
+    # ----- IVF index -----
+
+    def _nearest_centroids(self, vectors: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk):
+            out[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ self._centroids.T, axis=1)
+        return out
+
+    def _rebuild_lists(self):
+        rows = np.flatnonzero(self._assign[: self._count] >= 0)
+        order = rows[np.argsort(self._assign[rows], kind="stable")]
+        counts = np.bincount(self._assign[order], minlength=len(self._centroids))
+        self._lists = np.split(order, np.cumsum(counts)[:-1])
+
+    def build_ivf(self, nlist: int | None = None, iterations: int = 10, sample_size: int | None = None, seed: int = 0):
+        """Cluster the rows into `nlist` lists (spherical k-means on a sample)."""
+        rows = np.flatnonzero(self._alive[: self._count])
+        if rows.size == 0:
+            raise ValueError("Cannot build an IVF index on an empty store")
+        nlist = min(nlist or max(1, int(4 * np.sqrt(rows.size))), rows.size)
+        rng = np.random.default_rng(seed)
+        sample_size = min(rows.size, sample_size or max(nlist * 40, 10_000))
+        sample = np.asarray(self._vectors[np.sort(rng.choice(rows, sample_size, replace=False))])
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=nlist)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            empty = np.flatnonzero(~filled)
+            sums[empty] = sample[rng.choice(sample_size, empty.size, replace=False)]  # reseed empty lists
+            centroids = _normalize(sums)
+
+        self._centroids = centroids
+        self._assign = np.full(self._capacity, -1, dtype=np.int32)
+        self._assign[rows] = self._nearest_centroids(self._vectors[rows])
+        self._rebuild_lists()
+        self.flush()
+
+    def drop_ivf(self):
+        self._centroids = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._lists = []
+        if self.path is not None:
+            for name in ("centroids.npy", "assign.npy"):
+                (self.path / name).unlink(missing_ok=True)
+
+    # ----- search -----
+
+    def search_vector(
+        self,
+        vector: np.ndarray | list[float],
+        k: int = 4,
+        filter: dict[str, Any] | None = None,
+        exact: bool | None = None,
+        nprobe: int | None = None,
+    ) -> list[tuple[int, float]]:
+        """(row, cosine score) pairs, best first. IVF is used when built, unless exact=True."""
+        if self._count == 0:
+            return []
+        query = _normalize(vector)
+
+        matching = None  # sorted rows passing the filter (deleted rows are not in the index)
+        if filter:
+            matching = self._meta_index.lookup(filter)
+            if matching.size == 0:
+                return []
+
+        use_ivf = exact is False or (exact is None and self._centroids is not None)
+        if use_ivf and self._centroids is None:
+            raise ValueError("No IVF index: call build_ivf() first")
+        nprobe = nprobe or self.nprobe
+
+        # Selective filter: gathering and scoring just the matching rows is exact AND cheaper
+        # than a full scan (or than probing IVF lists that are mostly filtered out)
+        budget = nprobe * self._count / len(self._lists) if use_ivf else self.dense_filter_ratio * self._count
+        if matching is not None and matching.size <= budget:
+            scores = self._vectors[matching] @ query
+            return [(int(matching[i]), float(scores[i])) for i in _top_k(scores, k)]
+
+        allowed = self._alive[: self._count]
+        if matching is not None:
+            allowed = np.zeros(self._count, dtype=bool)
+            allowed[matching] = True
+
+        if use_ivf:
+            probe = _top_k(self._centroids @ query, nprobe)
+            candidates = np.concatenate([self._lists[i] for i in probe])
+            candidates = candidates[allowed[candidates]]
+            scores = self._vectors[candidates] @ query
+            return [(int(candidates[i]), float(scores[i])) for i in _top_k(scores, k)]
+
+        scores = self._vectors[: self._count] @ query
+        scores[~allowed] = -np.inf
+        return [(int(row), float(scores[row])) for row in _top_k(scores, k)]
+
+    def _document(self, row: int) -> Document:
+        return Document(page_content=self._texts[row], metadata=dict(self._metadatas[row]), id=self._ids[row])
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, filter: dict[str, Any] | None = None,
+                                    **kwargs: Any) -> list[Document]:
+        return [self._document(row) for row, _ in self.search_vector(embedding, k, filter, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict[str, Any] | None = None,
+                                     **kwargs: Any) -> list[tuple[Document, float]]:
+        hits = self.search_vector(self.embedding.embed_query(query), k, filter, **kwargs)
+        return [(self._document(row), score) for row, score in hits]
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict[str, Any] | None = None,
+                          **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter, **kwargs)]
+
+
+# =============================================================================
+# 🧪 Recall / latency benchmark (synthetic clustered vectors, no API calls)
+# =============================================================================
+
+
+def _clustered_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def benchmark(n: int, dim: int, queries: int, k: int, nlist: int | None, nprobes: list[int], path: str | None):
+    import tempfile
+    import time
+
+    rng = np.random.default_rng(42)
+    data = _clustered_vectors(n, dim, max(16, n // 1000), rng)
+    query_vectors = _normalize(data[rng.choice(n, queries, replace=False)]
+                               + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(path=path or tmp)
+        started = time.perf_counter()
+        for start in range(0, n, 10_000):
+            chunk = data[start:start + 10_000]
+            store.add_texts([f"doc {i}" for i in range(start, start + len(chunk))], vectors=chunk)
+        print(f"add: {n} vectors x {dim} in {time.perf_counter() - started:.2f}s (memmap: {store.path})")
+
+        started = time.perf_counter()
+        store.build_ivf(nlist)
+        print(f"build_ivf: {len(store._lists)} lists in {time.perf_counter() - started:.2f}s")
+
+        def run(**kwargs) -> tuple[list[list[int]], list[float]]:
+            results, latencies = [], []
+            for q in query_vectors:
+                t = time.perf_counter()
+                results.append([row for row, _ in store.search_vector(q, k, **kwargs)])
+                latencies.append((time.perf_counter() - t) * 1000)
+            return results, sorted(latencies)
+
+        truth, exact_ms = run(exact=True)
+        print(f"{'exact':>14}: p50 {exact_ms[len(exact_ms) // 2]:7.2f} ms  p95 {exact_ms[int(len(exact_ms) * .95)]:7.2f} ms"
+              f"  recall@{k} 1.000")
+        for nprobe in nprobes:
+            found, ivf_ms = run(exact=False, nprobe=nprobe)
+            recall = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(truth, found)])
+            print(f"{f'ivf nprobe={nprobe}':>14}: p50 {ivf_ms[len(ivf_ms) // 2]:7.2f} ms  "
+                  f"p95 {ivf_ms[int(len(ivf_ms) * .95)]:7.2f} ms  recall@{k} {recall:.3f}")
+
+        # Re-upsert existing ids, half unchanged and half moved: every IVF list must keep
+        # its rows, so probing all lists gives exactly the exact-search answer
+        rows = list(dict.fromkeys([*truth[0][:5], *range(50)]))[:50]  # includes the top hits
+        ids = [store._ids[row] for row in rows]
+        vectors = np.array(store._vectors[rows])
+        vectors[len(rows) // 2:] = _normalize(rng.standard_normal((len(rows) - len(rows) // 2, dim)))
+        store.add_texts([store._texts[row] for row in rows], ids=ids, vectors=vectors)
+        assert sum(len(lst) for lst in store._lists) == n
+        for q in query_vectors[:20]:
+            assert store.search_vector(q, k, nprobe=len(store._lists)) == store.search_vector(q, k, exact=True)
+        print("re-upsert with IVF: ok")
+
+        reopened = LocalVectorStore(path=store.path)
+        assert len(reopened) == n and reopened.search_vector(query_vectors[0], k, exact=True)[0][0] == truth[0][0]
+        print("reopen from memmap: ok")
+
+        # Deletes logged after an unflushed batch must still apply on reopen
+        reopened.add_texts(["never flushed"], ids=["pending"], vectors=data[:1], flush=False)
+        reopened.delete([reopened._ids[0]])
+        again = LocalVectorStore(path=store.path)
+        assert again._ids[0] not in again._rows and "pending" not in again._rows and len(again) == n - 1
+        print("deletes after an unflushed batch: ok")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exact vs IVF search benchmark")
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--path", default=None, help="store directory (default: a temp dir)")
+    args = parser.parse_args()
+    benchmark(args.n, args.dim, args.queries, args.k, args.nlist, args.nprobe, args.path)
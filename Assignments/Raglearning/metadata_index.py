@@ -0,0 +1,284 @@
+"""
+Inverted metadata index for pre-filtered vector search
+
+Documents carry metadata like {"source": "news"}. Checking every document's
+metadata per query (or filtering AFTER the similarity search) costs the same however
+selective the filter is. The index keeps, for every (field, value), the sorted array
+of row ids that have it (a posting list), so a filter becomes a few array
+intersections/unions and the vector search scores only the matching rows.
+
+Filters use Pinecone's syntax:
+
+    {"source": "news"}                                  # same as {"source": {"$eq": "news"}}
+    {"source": {"$in": ["news", "tweet"]}}
+    {"source": {"$ne": "website"}}                      # also $nin
+    {"year": {"$gte": 2020}}                            # also $gt, $lt, $lte (numbers)
+    {"$and": [{...}, {...}]}, {"$or": [{...}, {...}]}   # top-level keys are ANDed too
+
+List values ({"tags": ["ai", "rag"]}) match a filter on any of their elements.
+Values are compared by kind as well: {"flag": True} does not match `flag: 1`, while
+ints and floats are both numbers (2020 == 2020.0).
+
+Range operators binary-search a per-field array of (value, row) pairs sorted by value,
+so a range on a high-cardinality field (timestamps) costs O(log n + matches).
+"""
+
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+# operator → (is a lower bound, np.searchsorted side)
+_RANGE: dict[str, tuple[bool, str]] = {
+    "$gt": (True, "right"),
+    "$gte": (True, "left"),
+    "$lt": (False, "left"),
+    "$lte": (False, "right"),
+}
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersection of two sorted unique arrays: binary-search the smaller one into the larger."""
+    if a.size > b.size:
+        a, b = b, a
+    if a.size == 0:
+        return _EMPTY
+    found = np.minimum(np.searchsorted(b, a), b.size - 1)
+    return a[b[found] == a]
+
+
+def _key(item: Any) -> tuple[str, Any]:
+    """Posting key of one value. The kind keeps True, 1 and 1.0 from sharing a dict key."""
+    if isinstance(item, bool):
+        return ("bool", item)
+    if isinstance(item, (int, float)):
+        return ("number", item)
+    return ("null", None) if item is None else ("str", item)
+
+
+def _keys(value: Any) -> list[tuple[str, Any]]:
+    """Posting keys of one metadata entry (lists index every element)."""
+    items = value if isinstance(value, (list, tuple, set)) else [value]
+    return [_key(item) for item in items if isinstance(item, (str, int, float, bool)) or item is None]
+
+
+class MetadataIndex:
+    def __init__(self):
+        # field → (kind, value) → row ids; appended as Python lists, frozen to sorted arrays on read
+        self._postings: dict[str, dict[tuple[str, Any], list[int] | np.ndarray]] = {}
+        # row → (field, key) pairs, to remove a row on overwrite/delete
+        self._row_keys: dict[int, list[tuple[str, tuple[str, Any]]]] = {}
+        self._all: np.ndarray | None = None  # cached sorted ids of all indexed rows
+        # field → (numeric values sorted, their rows); built on the first range query,
+        # dropped when a number of that field is added or removed
+        self._ranges: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_keys)
+
+    def add(self, row: int, metadata: dict[str, Any]):
+        """Index a row (replaces whatever was indexed for it before)."""
+        if row in self._row_keys:
+            self.remove(row)
+        self._all = None
+        keys = []
+        for field, value in metadata.items():
+            by_value = self._postings.setdefault(field, {})
+            for key in _keys(value):
+                posting = by_value.get(key)
+                if posting is None:
+                    by_value[key] = [row]
+                elif isinstance(posting, list):
+                    posting.append(row)
+                else:
+                    by_value[key] = [*posting.tolist(), row]  # back to a list until the next read
+                if key[0] == "number":
+                    self._ranges.pop(field, None)
+                keys.append((field, key))
+        self._row_keys[row] = keys
+
+    def add_many(self, rows: Iterable[int], metadatas: Iterable[dict[str, Any]]):
+        """Index many rows; rows indexed before are removed in one batch first."""
+        rows = list(rows)
+        self.remove_many([row for row in rows if row in self._row_keys])
+        for row, metadata in zip(rows, metadatas):
+            self.add(row, metadata)
+
+    def remove(self, row: int):
+        self.remove_many([row])
+
+    def remove_many(self, rows: Iterable[int]):
+        """Unindex rows with one filtering pass per touched posting (not one per row)."""
+        removed: dict[tuple[str, tuple[str, Any]], list[int]] = {}
+        for row in rows:
+            for field_key in self._row_keys.pop(row, []):
+                removed.setdefault(field_key, []).append(row)
+        if not removed:
+            return
+        self._all = None
+        for (field, key), gone in removed.items():
+            posting = self._posting(field, key)
+            remaining = posting[posting != gone[0]] if len(gone) == 1 else posting[~np.isin(posting, gone)]
+            if remaining.size:
+                self._postings[field][key] = remaining
+            else:
+                del self._postings[field][key]
+            if key[0] == "number":
+                self._ranges.pop(field, None)
+
+    def _posting(self, field: str, key: tuple[str, Any]) -> np.ndarray:
+        by_value = self._postings.get(field)
+        if not by_value or key not in by_value:
+            return _EMPTY
+        posting = by_value[key]
+        if isinstance(posting, list):
+            # Rows mostly arrive in increasing order, so this sort is usually a no-op pass
+            posting = np.unique(np.asarray(posting, dtype=np.int64))
+            by_value[key] = posting
+        return posting
+
+    def _sorted_unique(self, rows: np.ndarray) -> np.ndarray:
+        if rows.size < len(self._row_keys) // 32:
+            return np.unique(rows)
+        # Big results (e.g. year >= 2020): scatter into a bitmap instead of sorting
+        mask = np.zeros(int(rows.max()) + 1, dtype=bool)
+        mask[rows] = True
+        return np.flatnonzero(mask)
+
+    def _union(self, field: str, values: Iterable[Any]) -> np.ndarray:
+        postings = [self._posting(field, _key(value)) for value in values]
+        postings = [p for p in postings if p.size]
+        if not postings:
+            return _EMPTY
+        if len(postings) == 1:
+            return postings[0]
+        return self._sorted_unique(np.concatenate(postings))
+
+    def _range_arrays(self, field: str) -> tuple[np.ndarray, np.ndarray]:
+        cached = self._ranges.get(field)
+        if cached is None:
+            keys = [key for key in self._postings.get(field, {}) if key[0] == "number"]
+            postings = [self._posting(field, key) for key in keys]
+            if postings:
+                values = np.repeat(np.array([value for _, value in keys], dtype=np.float64),
+                                   [p.size for p in postings])
+                rows = np.concatenate(postings)
+                order = np.argsort(values, kind="stable")
+                cached = (values[order], rows[order])
+            else:
+                cached = (np.empty(0, dtype=np.float64), _EMPTY)
+            self._ranges[field] = cached
+        return cached
+
+    def _range(self, field: str, op: str, bound: Any) -> np.ndarray:
+        if isinstance(bound, bool) or not isinstance(bound, (int, float)):
+            raise ValueError(f"{op} needs a number, got {bound!r}")
+        values, rows = self._range_arrays(field)
+        lower, side = _RANGE[op]
+        cut = int(np.searchsorted(values, bound, side=side))
+        matched = rows[cut:] if lower else rows[:cut]
+        return self._sorted_unique(matched) if matched.size else _EMPTY
+
+    def _all_rows(self) -> np.ndarray:
+        if self._all is None:
+            self._all = np.fromiter(sorted(self._row_keys), dtype=np.int64, count=len(self._row_keys))
+        return self._all
+
+    def _condition(self, field: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        result: np.ndarray | None = None
+        for op, operand in condition.items():
+            if op == "$eq":
+                rows = self._posting(field, _key(operand))
+            elif op == "$in":
+                rows = self._union(field, operand)
+            elif op in ("$ne", "$nin"):
+                excluded = self._union(field, [operand] if op == "$ne" else operand)
+                rows = np.setdiff1d(self._all_rows(), excluded, assume_unique=True)
+            elif op in _RANGE:
+                rows = self._range(field, op, operand)
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            result = rows if result is None else _intersect(result, rows)
+        return _EMPTY if result is None else result
+
+    def lookup(self, filter: dict[str, Any]) -> np.ndarray:
+        """Sorted row ids matching a Pinecone-style filter."""
+        result: np.ndarray | None = None
+        for key, condition in filter.items():
+            if key == "$and":
+                parts = [self.lookup(sub) for sub in condition]
+                rows = parts[0] if parts else self._all_rows()
+                for part in parts[1:]:
+                    rows = _intersect(rows, part)
+            elif key == "$or":
+                parts = [self.lookup(sub) for sub in condition]
+                rows = np.unique(np.concatenate(parts)) if parts else _EMPTY
+            else:
+                rows = self._condition(key, condition)
+            result = rows if result is None else _intersect(result, rows)
+            if result.size == 0:
+                break
+        return self._all_rows() if result is None else result
+
+    def count(self, filter: dict[str, Any]) -> int:
+        return int(self.lookup(filter).size)
+
+
+# 🧪 Pre-filter vs post-filter: python metadata_index.py
+if __name__ == "__main__":
+    import time
+
+    from local_vector_store import LocalVectorStore
+
+    n, dim = 200_000, 256
+    rng = np.random.default_rng(0)
+    sources = rng.choice(["news", "tweet", "website"], size=n, p=[0.02, 0.49, 0.49])
+    store = LocalVectorStore()
+    for start in range(0, n, 20_000):
+        stop = min(start + 20_000, n)
+        store.add_texts([f"doc {i}" for i in range(start, stop)],
+                        [{"source": str(s), "year": int(2015 + i % 10), "ts": 1.7e9 + i * 0.5}
+                         for i, s in zip(range(start, stop), sources[start:stop])],
+                        vectors=rng.standard_normal((stop - start, dim)).astype(np.float32))
+    queries = rng.standard_normal((100, dim)).astype(np.float32)
+
+    def post_filter(query: np.ndarray, keep_row: Callable[[dict[str, Any]], bool], k: int = 10) -> list[int]:
+        """The old way: score every row, then check metadata in Python."""
+        scores = store._vectors[: store._count] @ (query / np.linalg.norm(query))
+        keep = np.fromiter((keep_row(store._metadatas[r]) for r in range(store._count)),
+                           dtype=bool, count=store._count)
+        scores[~keep] = -np.inf
+        return [int(r) for r in np.argsort(-scores)[:k]]
+
+    cases = [
+        ({"source": "news"}, lambda m: m["source"] == "news"),
+        ({"source": "tweet", "year": 2020}, lambda m: m["source"] == "tweet" and m["year"] == 2020),
+        ({"source": "news", "year": {"$gte": 2022}}, lambda m: m["source"] == "news" and m["year"] >= 2022),
+        ({"source": {"$ne": "news"}}, lambda m: m["source"] != "news"),
+        ({"ts": {"$gte": 1.7e9 + 40_000, "$lt": 1.7e9 + 45_000}},  # 10,000 distinct values
+         lambda m: 1.7e9 + 40_000 <= m["ts"] < 1.7e9 + 45_000),
+    ]
+    for filter, keep_row in cases:
+        started = time.perf_counter()
+        slow = [post_filter(q, keep_row) for q in queries[:10]]
+        post_ms = (time.perf_counter() - started) * 100
+        started = time.perf_counter()
+        fast = [[row for row, _ in store.search_vector(q, 10, filter)] for q in queries]
+        pre_ms = (time.perf_counter() - started) * 10
+        assert fast[:10] == slow, filter
+        print(f"{str(filter):42} matches {store._meta_index.count(filter):>6}: "
+              f"post-filter {post_ms:7.2f} ms, pre-filter {pre_ms:6.2f} ms per query")
+
+    # Kinds don't collide, overwrites and batch removals keep postings and ranges exact
+    index = MetadataIndex()
+    index.add_many(range(4), [{"flag": True}, {"flag": 1}, {"flag": 1.0}, {"flag": "1"}])
+    assert index.lookup({"flag": True}).tolist() == [0] and index.lookup({"flag": 1}).tolist() == [1, 2]
+    assert index.lookup({"flag": {"$gte": 1}}).tolist() == [1, 2]
+    index.add_many([1, 3], [{"flag": 5}, {"flag": 0}])
+    index.remove_many([0, 2])
+    assert index.lookup({"flag": {"$gt": 0}}).tolist() == [1] and index.lookup({"flag": 0}).tolist() == [3]
+    assert index.lookup({"flag": True}).size == 0 and len(index) == 2
+    print("value kinds, overwrites and batch removals: ok")
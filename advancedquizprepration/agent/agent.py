@@ -140,12 +140,38 @@ tool = client.beta.tools.register(
     }
 )
 
-# 3️⃣ Create an Agent with the tool
+# 2️⃣➕ Register a batch tool: many computations in ONE tool call (NumPy, vectorized)
+from batch_calculator import (
+    BATCH_CALCULATOR_PARAMETERS,
+    EVALUATE_EXPRESSIONS_PARAMETERS,
+    batch_calculator,
+    evaluate_expressions,
+)
+
+batch_tool = client.beta.tools.register(
+    function=batch_calculator,
+    name="batch_calculator",
+    description="Applies operations to many (a, b) pairs at once. Division by zero gives null for that pair.",
+    parameters=BATCH_CALCULATOR_PARAMETERS,
+)
+
+expressions_tool = client.beta.tools.register(
+    function=evaluate_expressions,
+    name="evaluate_expressions",
+    description="Evaluates a list of arithmetic expressions like '23 * 47' in one call.",
+    parameters=EVALUATE_EXPRESSIONS_PARAMETERS,
+)
+
+# 3️⃣ Create an Agent with the tools
 agent = client.beta.agents.create(
     name="Math Agent",
-    instructions="You are a helpful agent that solves math problems using the calculator tool.",
+    instructions=(
+        "You are a helpful agent that solves math problems using the calculator tools. "
+        "When there are several computations, do them all in ONE batch_calculator or "
+        "evaluate_expressions call instead of calling the calculator once per operation."
+    ),
     model="gpt-4-turbo",
-    tools=[tool.id]
+    tools=[tool.id, batch_tool.id, expressions_tool.id]
 )
 
 # 4️⃣ Create a conversation thread
@@ -158,37 +184,44 @@ client.beta.threads.messages.create(
     content="What is 23 multiplied by 47?"
 )
 
-# 6️⃣ Run the agent on the thread
-run = client.beta.threads.runs.create(
-    thread_id=thread.id,
-    agent_id=agent.id,
-    instructions="Use the calculator tool if needed to answer correctly."
-)
-
-# 7️⃣ Wait for the run to complete
-import time
-
-while True:
-    run_status = client.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
-    if run_status.status == "completed":
-        break
-    elif run_status.status in ["failed", "cancelled"]:
-        raise Exception(f"Run failed with status: {run_status.status}")
-    time.sleep(1)
+# 6️⃣ Run the agent on the thread and 7️⃣ wait for it to complete
+# RunWatcher creates the run with stream=True and resolves it from the run events, so
+# it is done the moment the run is (no thread blocked in time.sleep, no fixed 1s delay).
+# Without streaming support it falls back to async polling with adaptive backoff; one
+# watcher can wait for thousands of runs at once
+import asyncio
+from openai import AsyncOpenAI
+from run_watcher import RunWatcher
+
+async def run_agent():
+    watcher = RunWatcher(AsyncOpenAI())
+    return await watcher.create_and_wait(
+        thread.id,
+        agent_id=agent.id,
+        instructions="Use the calculator tool if needed to answer correctly."
+    )
+
+run_status = asyncio.run(run_agent())
+if run_status.status != "completed":
+    raise Exception(f"Run failed with status: {run_status.status}")
 
 # 8️⃣ Get the final response
-messages = client.beta.threads.messages.list(thread_id=thread.id)
+# TranscriptReader remembers the last message it read and fetches only newer ones
+# (order="asc", after=<cursor>), so each turn costs O(new messages), not O(thread)
+from transcript_reader import TranscriptReader
+
+reader = TranscriptReader(client)
 
 print("🧠 Agent's Final Reply:")
-for msg in messages.data:
-    if msg.role == "assistant":
-        print(msg.content[0].text.value)
+for text in reader.new_texts(thread.id, role="assistant"):
+    print(text)
 
 
 # | Concept      | Code Part                                    |
 # | ------------ | -------------------------------------------- |
 # | Define tool  | `def calculator()` and `tools.register(...)` |
+# | Batch tool   | `batch_calculator(a=[...], b=[...], ...)`    |
 # | Create agent | `agents.create(...)` with tools              |
 # | Add message  | `messages.create(...)`                       |
-# | Run agent    | `runs.create(...)`                           |
-# | Get response | `messages.list(...)`                         |
+# | Run and wait | `RunWatcher(...).create_and_wait(thread_id)` |
+# | Get response | `TranscriptReader(...).new_texts(thread_id)` |
@@ -0,0 +1,216 @@
+# 🧮 Batch calculator tool
+#
+# The simple `calculator(a, b, operation)` tool does ONE operation per call, so
+# "add up these 300 invoices" means 300 model ↔ tool round trips. The batch
+# calculator takes whole arrays and answers in ONE call:
+#
+#     batch_calculator(a=[1, 2, 3], b=[4, 0, 6], operations=["add", "divide", "multiply"])
+#     → {"results": [5, null, 18], "errors": {"1": "Cannot divide by zero"}}
+#
+# - operations is one name for all pairs, or one name per pair
+# - every operation is evaluated vectorized with NumPy (one ufunc call per operation
+#   type, not a Python loop per pair)
+# - division/modulo by zero and overflow are masked: that result is null and its
+#   index is listed in "errors"; the other results are still returned
+# - `evaluate_expressions(["2 * (3 + 4)", ...])` is the safe expression variant
+#   (arithmetic only, parsed with `ast`, never `eval`)
+
+import ast
+import math
+import operator
+from typing import Any
+
+import numpy as np
+
+OPERATIONS = ("add", "subtract", "multiply", "divide", "power", "modulo")
+
+_UFUNCS = {
+    "add": np.add,
+    "subtract": np.subtract,
+    "multiply": np.multiply,
+    "divide": np.divide,
+    "power": np.power,
+    "modulo": np.mod,
+}
+
+
+def _compact(value: float) -> int | float:
+    """5.0 → 5, so results stay short in the model's context."""
+    return int(value) if value.is_integer() and abs(value) < 2**53 else value
+
+
+def batch_calculator(a: list[float], b: list[float], operations: list[str] | str) -> dict[str, Any]:
+    """Apply operations[i] to (a[i], b[i]) for every i, vectorized."""
+    left = np.asarray(a, dtype=np.float64)
+    right = np.asarray(b, dtype=np.float64)
+    if left.shape != right.shape or left.ndim != 1:
+        return {"results": [], "errors": {"all": "a and b must be lists of the same length"}}
+
+    ops = np.asarray([operations] * len(left) if isinstance(operations, str) else operations)
+    if ops.shape != left.shape:
+        return {"results": [], "errors": {"all": "operations must be one name or one per pair"}}
+
+    results = np.full(left.shape, np.nan)
+    errors: dict[str, str] = {}
+
+    with np.errstate(all="ignore"):  # masked below instead of warnings
+        for name, ufunc in _UFUNCS.items():
+            mask = ops == name
+            if mask.any():
+                results[mask] = ufunc(left[mask], right[mask])
+
+    by_zero = np.isin(ops, ("divide", "modulo")) & (right == 0)
+    invalid = ~np.isin(ops, OPERATIONS)
+    overflow = ~np.isfinite(results) & ~by_zero & ~invalid
+
+    for index in np.flatnonzero(by_zero):
+        errors[str(index)] = "Cannot divide by zero"
+    for index in np.flatnonzero(invalid):
+        errors[str(index)] = f"Invalid operation: {ops[index]}"
+    for index in np.flatnonzero(overflow):
+        errors[str(index)] = "Result is not a finite number"
+
+    bad = by_zero | invalid | overflow
+    return {
+        "results": [None if bad[i] else _compact(float(v)) for i, v in enumerate(results)],
+        "errors": errors,
+    }
+
+
+# =============================================================================
+# Safe expression list
+# =============================================================================
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+# Results end up as floats (max ~2**1024), so larger integers are useless; bounding
+# them BEFORE multiplying keeps "((10**1000)**1000)**30" from burning minutes of CPU
+MAX_INT_BITS = 4096
+# Deeply nested input ("-" * 1000 + "1") would exhaust the parser's or _evaluate's
+# recursion; no real calculation needs expressions this long
+MAX_EXPRESSION_CHARS = 500
+
+
+def _check_size(op: ast.operator, left: float, right: float):
+    """Raise OverflowError if an integer Pow/Mult result would exceed MAX_INT_BITS."""
+    if not (isinstance(left, int) and isinstance(right, int)):
+        return  # float arithmetic overflows (or becomes inf) by itself
+    if isinstance(op, ast.Pow) and right > 0 and abs(left) > 1:
+        bits = (abs(left).bit_length() - 1) * right
+    elif isinstance(op, ast.Mult):
+        bits = left.bit_length() + right.bit_length() - 1
+    else:
+        return
+    if bits > MAX_INT_BITS:
+        raise OverflowError("Result too large")
+
+
+def _evaluate(node: ast.AST) -> float:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        _check_size(node.op, left, right)
+        result = _BINARY[type(node.op)](left, right)
+        if isinstance(result, complex):  # e.g. (-8) ** 0.5
+            raise ValueError("Result is not a real number")
+        return result
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        return _UNARY[type(node.op)](_evaluate(node.operand))
+    raise ValueError("Only numbers and + - * / // % ** ( ) are allowed")
+
+
+def evaluate_expressions(expressions: list[str]) -> dict[str, Any]:
+    """Evaluate arithmetic expressions like "2 * (3 + 4)"; errors are reported per index."""
+    results: list[int | float | None] = []
+    errors: dict[str, str] = {}
+    for index, expression in enumerate(expressions):
+        try:
+            if len(expression) > MAX_EXPRESSION_CHARS:
+                raise ValueError(f"Expression longer than {MAX_EXPRESSION_CHARS} characters")
+            value = float(_evaluate(ast.parse(expression, mode="eval")))
+            if not math.isfinite(value):  # inf/nan would make the tool output invalid JSON
+                raise OverflowError("Result is not a finite number")
+            results.append(_compact(value))
+        except ZeroDivisionError:
+            results.append(None)
+            errors[str(index)] = "Cannot divide by zero"
+        except (RecursionError, MemoryError):
+            results.append(None)
+            errors[str(index)] = "Expression is nested too deeply"
+        except (SyntaxError, ValueError, OverflowError) as e:
+            results.append(None)
+            errors[str(index)] = str(e) or "Invalid expression"
+    return {"results": results, "errors": errors}
+
+
+# JSON schema for registering the tool (same shape as the single calculator)
+BATCH_CALCULATOR_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "a": {"type": "array", "items": {"type": "number"}, "description": "First operands"},
+        "b": {"type": "array", "items": {"type": "number"}, "description": "Second operands"},
+        "operations": {
+            "description": "One operation for all pairs, or one per pair",
+            "anyOf": [
+                {"type": "string", "enum": list(OPERATIONS)},
+                {"type": "array", "items": {"type": "string", "enum": list(OPERATIONS)}},
+            ],
+        },
+    },
+    "required": ["a", "b", "operations"],
+}
+
+EVALUATE_EXPRESSIONS_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "expressions": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": 'Arithmetic expressions, e.g. "23 * 47" or "(1 + 2) / 3"',
+        },
+    },
+    "required": ["expressions"],
+}
+
+
+# 🧪 One call instead of 100,000: python batch_calculator.py
+if __name__ == "__main__":
+    import json
+    import random
+    import time
+
+    print(batch_calculator([1, 2, 3, 2], [4, 0, 6, 1e6], ["add", "divide", "multiply", "power"]))
+    print(evaluate_expressions(["23 * 47", "(1 + 2) / 3", "1 / 0", "__import__('os')"]))
+
+    started = time.perf_counter()
+    huge = evaluate_expressions(["((10**1000)**1000)**30", "10 ** 10 ** 10", "10**300 * 10**7", "(-8) ** 0.5"])
+    assert huge["results"] == [None, None, 1e307, None], huge
+    assert time.perf_counter() - started < 0.1
+    print(f"oversized expressions rejected: {huge}")
+
+    hostile = evaluate_expressions(["1e308 * 10", "1e308*10 - 1e308*10", "-" * 1000 + "1", "(" * 90 + "1" + ")" * 90])
+    assert hostile["results"] == [None, None, None, 1], hostile
+    json.dumps(hostile, allow_nan=False)  # valid JSON: no Infinity/NaN
+    print(f"non-finite and deeply nested expressions rejected: {hostile['errors']}")
+
+    n = 100_000
+    a = [random.uniform(-100, 100) for _ in range(n)]
+    b = [random.choice([0.0, random.uniform(-100, 100)]) for _ in range(n)]
+    ops = [random.choice(OPERATIONS[:4]) for _ in range(n)]
+
+    started = time.perf_counter()
+    out = batch_calculator(a, b, ops)
+    elapsed = time.perf_counter() - started
+    print(f"{n} operations in {elapsed * 1000:.0f} ms, {len(out['errors'])} masked divisions by zero")
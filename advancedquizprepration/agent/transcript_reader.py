@@ -0,0 +1,116 @@
+# 📜 TranscriptReader: read only the NEW messages of a thread
+#
+# `client.beta.threads.messages.list(thread_id=...)` returns the newest messages
+# first, so finding the reply of the last run means walking the thread again after
+# every run: the cost grows with the length of the thread.
+#
+# TranscriptReader remembers, per thread, the id of the last message it has seen
+# (the cursor) and asks only for what came after it:
+#
+#     messages.list(thread_id=..., order="asc", after=<cursor>, limit=100)
+#
+# - new messages are appended to a local transcript cache
+# - each turn costs O(new messages), however long the thread is
+# - a message still being written (status "in_progress") is not consumed yet, so
+#   the cursor never skips past an unfinished reply
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+def message_text(message: Any) -> str:
+    """Text parts of a message joined together (images and files are skipped)."""
+    return "".join(part.text.value for part in message.content if getattr(part, "type", None) == "text")
+
+
+@dataclass
+class ThreadTranscript:
+    thread_id: str
+    messages: list[Any] = field(default_factory=list)
+    cursor: str | None = None  # id of the newest message already read
+
+    def texts(self, role: str | None = None) -> list[str]:
+        return [message_text(m) for m in self.messages if role is None or m.role == role]
+
+
+class TranscriptReader:
+    def __init__(self, client: Any, page_size: int = 100):
+        self.client = client  # openai.OpenAI
+        self.page_size = page_size
+        self.transcripts: dict[str, ThreadTranscript] = {}
+
+        # 📊 metrics
+        self.requests = 0
+        self.messages_fetched = 0
+
+    def transcript(self, thread_id: str) -> ThreadTranscript:
+        if thread_id not in self.transcripts:
+            self.transcripts[thread_id] = ThreadTranscript(thread_id)
+        return self.transcripts[thread_id]
+
+    def refresh(self, thread_id: str) -> list[Any]:
+        """Fetch the messages added since the last call and return them (oldest first)."""
+        transcript = self.transcript(thread_id)
+        new: list[Any] = []
+        while True:
+            params = {"thread_id": thread_id, "order": "asc", "limit": self.page_size}
+            if transcript.cursor is not None:
+                params["after"] = transcript.cursor
+            page = self.client.beta.threads.messages.list(**params)
+            self.requests += 1
+            self.messages_fetched += len(page.data)
+
+            for message in page.data:
+                if getattr(message, "status", None) == "in_progress":
+                    transcript.messages.extend(new)
+                    return new  # read it (and anything after it) next time
+                new.append(message)
+                transcript.cursor = message.id
+
+            if not page.data or not getattr(page, "has_more", False):
+                break
+
+        transcript.messages.extend(new)
+        return new
+
+    def new_texts(self, thread_id: str, role: str | None = "assistant") -> list[str]:
+        """Texts of the new messages, e.g. the assistant's replies to the last run."""
+        return [message_text(m) for m in self.refresh(thread_id) if role is None or m.role == role]
+
+    def forget(self, thread_id: str):
+        self.transcripts.pop(thread_id, None)
+
+
+# 🧪 A long thread, read turn by turn: python transcript_reader.py
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    def make_message(i: int, role: str) -> Any:
+        text = SimpleNamespace(type="text", text=SimpleNamespace(value=f"{role} message {i}"))
+        return SimpleNamespace(id=f"msg_{i:05d}", role=role, content=[text], status="completed")
+
+    class FakeMessages:
+        def __init__(self):
+            self.thread: list[Any] = []
+
+        def list(self, thread_id: str, order: str = "desc", after: str | None = None, limit: int = 20):
+            ordered = self.thread if order == "asc" else self.thread[::-1]
+            start = 0
+            if after is not None:
+                start = next(i for i, m in enumerate(ordered) if m.id == after) + 1
+            data = ordered[start:start + limit]
+            return SimpleNamespace(data=data, has_more=start + limit < len(ordered))
+
+    messages = FakeMessages()
+    client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(messages=messages)))
+    reader = TranscriptReader(client)
+
+    for turn in range(500):
+        messages.thread.append(make_message(2 * turn, "user"))
+        messages.thread.append(make_message(2 * turn + 1, "assistant"))
+        replies = reader.new_texts("thread_1")
+        assert replies == [f"assistant message {2 * turn + 1}"], replies
+
+    print(f"500 turns: {reader.requests} requests, {reader.messages_fetched} messages fetched "
+          f"(listing the whole thread each turn: {sum(2 * t + 2 for t in range(500))})")
+    assert len(reader.transcript("thread_1").messages) == 1000
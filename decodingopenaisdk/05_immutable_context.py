@@ -77,12 +77,14 @@ async def test_preference_agent():
 # Track topics discussed, mood, and number of messages.
 
 from datetime import datetime
+from vector_memory import VectorMemory
 
 # Context to track session state
 class SessionContext:
     def __init__(self):
         self.messages_count = 0
         self.topics_discussed: set[str] = set()
+        self.topic_memory = VectorMemory()  # semantic index over every topic
         self.user_mood = "neutral"
         self.start_time = datetime.now()
 
@@ -91,12 +93,32 @@ class SessionContext:
 
     def add_topic(self, topic: str):
         self.topics_discussed.add(topic)
+        self.topic_memory.add(topic)
+
+    def related_topics(self, query: str, k: int = 3) -> list[str]:
+        return [topic for topic, _ in self.topic_memory.search(query, k)]
 
     def set_mood(self, mood: str):
         self.user_mood = mood
 
     def get_session_info(self) -> str:
         return f"Messages: {self.messages_count}, Topics: {self.topics_discussed}, Mood: {self.user_mood}"
+
+    # Save/restore support for context_codec (the topic index is rebuilt on load)
+    def to_state(self) -> dict:
+        return {
+            "messages_count": self.messages_count,
+            "topics_discussed": self.topics_discussed,
+            "user_mood": self.user_mood,
+            "start_time": self.start_time,
+        }
+
+    def load_state(self, state: dict):
+        self.messages_count = state["messages_count"]
+        self.user_mood = state["user_mood"]
+        self.start_time = state["start_time"]
+        for topic in state["topics_discussed"]:
+            self.add_topic(topic)
     
 
 
@@ -116,11 +138,15 @@ def set_mood(ctx: RunContextWrapper[SessionContext], mood: str) -> str:
 def get_session_info(ctx: RunContextWrapper[SessionContext]) -> str:
     return ctx.context.get_session_info()
 
+@function_tool
+def find_related_topics(ctx: RunContextWrapper[SessionContext], query: str, k: int = 3) -> list[str]:
+    return ctx.context.related_topics(query, k)
+
 # Agent
 session_agent = Agent(
     name="SessionAgent",
     instructions="Help users track topics and mood.",
-    tools=[track_topic, set_mood, get_session_info]
+    tools=[track_topic, set_mood, get_session_info, find_related_topics]
 )
 
 async def test_session_agent():
@@ -144,66 +170,126 @@ async def test_session_agent():
 
 
 from typing import Dict, List, Any
+from context_access import VersionedContext, declare_access, guard_tools
 
 # Context with memory and task support
-class AdvancedContext:
+# Fields are versioned, so tool calls running in parallel never overwrite each other:
+# each update works on a snapshot and is committed with compare-and-swap (retried on conflict).
+class AdvancedContext(VersionedContext):
     def __init__(self):
-        self.user_profile: Dict[str, Any] = {}
-        self.conversation_memory: List[str] = []
-        self.task_queue: List[str] = []
-        self.completed_tasks: List[str] = []
+        super().__init__()
+        self.define("user_profile", {})
+        self.define("conversation_memory", [])  # short recent window (last 10)
+        self.define("task_queue", [])
+        self.define("completed_tasks", [])
+        self.fact_memory = VectorMemory()  # every fact, recalled by similarity
+
+    # Read-only views of the latest committed values
+    @property
+    def user_profile(self) -> Dict[str, Any]:
+        return self.get("user_profile")
+
+    @property
+    def conversation_memory(self) -> List[str]:
+        return self.get("conversation_memory")
+
+    @property
+    def task_queue(self) -> List[str]:
+        return self.get("task_queue")
+
+    @property
+    def completed_tasks(self) -> List[str]:
+        return self.get("completed_tasks")
 
     def add_memory(self, memory: str):
-        self.conversation_memory.append(memory)
-        if len(self.conversation_memory) > 10:
-            self.conversation_memory.pop(0)
+        self.fact_memory.add(memory)
+
+        def append(fields):
+            fields["conversation_memory"] = (fields["conversation_memory"] + [memory])[-10:]
+
+        self.transact(append, writes=["conversation_memory"])
+
+    def recall(self, query: str, k: int = 5) -> List[str]:
+        return [fact for fact, _ in self.fact_memory.search(query, k)]
+
+    # Save/restore support for context_codec (fact vectors are re-embedded on load)
+    def to_state(self) -> Dict[str, Any]:
+        return {**super().to_state(), "facts": self.fact_memory.texts}
+
+    def load_state(self, state: Dict[str, Any]):
+        state = dict(state)
+        self.fact_memory.add_many(state.pop("facts", []))
+        super().load_state(state)
 
     def add_task(self, task: str):
-        self.task_queue.append(task)
+        self.transact(lambda fields: fields["task_queue"].append(task), writes=["task_queue"])
 
     def complete_task(self, task: str):
-        if task in self.task_queue:
-            self.task_queue.remove(task)
-            self.completed_tasks.append(task)
+        def move(fields):
+            if task not in fields["task_queue"]:
+                return False
+            fields["task_queue"].remove(task)
+            fields["completed_tasks"].append(task)
             return True
-        return False
 
-# Tools
+        return self.transact(move, writes=["task_queue", "completed_tasks"])
+
+    def update_profile(self, key: str, value: str):
+        def set_key(fields):
+            fields["user_profile"][key] = value
+
+        self.transact(set_key, writes=["user_profile"])
+
+# Tools (each one declares the fields it reads/writes, so non-conflicting calls can overlap)
+@declare_access(writes={"conversation_memory", "fact_memory"})
 @function_tool
 def remember_fact(ctx: RunContextWrapper[AdvancedContext], fact: str) -> str:
     ctx.context.add_memory(fact)
     return f"Remembered: {fact}"
 
+# Only the k most relevant facts go back to the model, not the whole history
+@declare_access(reads={"fact_memory"})
+@function_tool
+def recall_facts(ctx: RunContextWrapper[AdvancedContext], query: str, k: int = 5) -> List[str]:
+    return ctx.context.recall(query, k)
+
+@declare_access(writes={"task_queue"})
 @function_tool
 def add_task(ctx: RunContextWrapper[AdvancedContext], task: str) -> str:
     ctx.context.add_task(task)
     return f"Added task: {task}"
 
+@declare_access(writes={"task_queue", "completed_tasks"})
 @function_tool
 def complete_task(ctx: RunContextWrapper[AdvancedContext], task: str) -> str:
     if ctx.context.complete_task(task):
         return f"Completed: {task}"
     return f"Task not found: {task}"
 
+@declare_access(reads={"conversation_memory", "task_queue", "completed_tasks", "user_profile"})
 @function_tool
 def get_status(ctx: RunContextWrapper[AdvancedContext]) -> Dict[str, Any]:
+    # One consistent snapshot instead of four separate reads
+    fields, _ = ctx.context.snapshot(["conversation_memory", "task_queue", "completed_tasks", "user_profile"])
     return {
-        "memories": ctx.context.conversation_memory,
-        "pending_tasks": ctx.context.task_queue,
-        "completed_tasks": ctx.context.completed_tasks,
-        "profile": ctx.context.user_profile
+        "memories": fields["conversation_memory"],
+        "pending_tasks": fields["task_queue"],
+        "completed_tasks": fields["completed_tasks"],
+        "profile": fields["user_profile"]
     }
 
+@declare_access(writes={"user_profile"})
 @function_tool
 def update_profile(ctx: RunContextWrapper[AdvancedContext], key: str, value: str) -> str:
-    ctx.context.user_profile[key] = value
+    ctx.context.update_profile(key, value)
     return f"Updated profile: {key} = {value}"
 
 # Agent
 advanced_agent = Agent(
     name="AdvancedAgent",
-    instructions="Remember things, manage tasks, update profile, and provide status.",
-    tools=[remember_fact, add_task, complete_task, get_status, update_profile]
+    instructions="Remember things, manage tasks, update profile, and provide status. Use recall_facts to look up older facts.",
+    # guard_tools: calls on different fields run together, conflicting ones take turns
+    tools=guard_tools([remember_fact, recall_facts, add_task, complete_task, get_status, update_profile]),
 )
 
 async def test_advanced_agent():
@@ -230,8 +316,17 @@ async def test_advanced_agent():
 
 
 
+# 💾 Saving and restoring a context between runs (compact binary, see context_codec.py)
+from context_codec import dump_context, load_context
+
+def save_and_restore(context: AdvancedContext) -> AdvancedContext:
+    blob = dump_context(context)
+    print(f"Saved context: {len(blob)} bytes")
+    return load_context(blob, AdvancedContext)
+
+
 # 🔄 main() to test any of the above
-        async def main():
+async def main():
     # Uncomment any one to test
     # await test_preference_agent()
     # await test_session_agent()
@@ -247,3 +342,4 @@ if __name__ == "__main__":
 # | PreferenceAgent | `MyContext`       | Save, retrieve, and clear user preferences |
 # | SessionAgent    | `SessionContext`  | Track topics, mood, session state          |
 # | AdvancedAgent   | `AdvancedContext` | Manage memory, tasks, profile, and status  |
+# |                 |                   | + `recall_facts` for top-k semantic recall |
@@ -16,9 +16,11 @@ from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional, Union, Literal, Any
 from enum import Enum
 from datetime import datetime
-from agents import Agent, Runner, AgentOutputSchema
+from agents import Agent, Runner
 import asyncio
 
+from schema_registry import output_schema, stats, warmup
+
 # =============================================================================
 # USE CASE 1: Basic Strict Schema (Recommended for Production)
 # =============================================================================
@@ -120,19 +122,19 @@ class ComplexUserProfile(BaseModel):
 # Enables nested validation for real-world profiles
 
 
-✅ USE CASE 4: List-Based Strict Schema
-python
-Copy
-Edit
+# =============================================================================
+# USE CASE 4: List-Based Strict Schema
+# =============================================================================
+
+
 class CourseGrade(BaseModel):
     course_name: str = ""
     grade: str = ""
     credits: int = 0
 
     model_config = ConfigDict(extra="forbid")
-python
-Copy
-Edit
+
+
 class StudentTranscript(BaseModel):
     """
     ✅ STRICT MODE COMPATIBLE
@@ -147,13 +149,18 @@ class StudentTranscript(BaseModel):
     graduation_status: Literal["enrolled", "graduated", "dropped"] = "enrolled"
 
     model_config = ConfigDict(extra="forbid")
-✅ Why use it?
-Excellent for returning batch/tabular-like data (e.g., transcripts, reports)
 
-❌ USE CASE 5: Flexible Non-Strict Schema
-python
-Copy
-Edit
+# ✅ Why use it?
+# Excellent for returning batch/tabular-like data (e.g., transcripts, reports)
+
+
+
+
+# =============================================================================
+# USE CASE 5: Flexible Non-Strict Schema
+# =============================================================================
+
+
 class FlexibleAnalysis(BaseModel):
     """
     ❌ NON-STRICT MODE ONLY
@@ -169,15 +176,20 @@ class FlexibleAnalysis(BaseModel):
     timestamp: Optional[datetime] = None
 
     model_config = ConfigDict(extra="allow")  # ✅ Allow unknown fields
-⚠️ Trade-offs:
-Great for exploration, dynamic data, and debugging
 
-Avoid in production unless you sanitize inputs properly
+# ⚠️ Trade-offs:
+# Great for exploration, dynamic data, and debugging
+
+# Avoid in production unless you sanitize inputs properly
+
+
+
+
+# =============================================================================
+# USE CASE 6: Validated Strict Schema
+# =============================================================================
+
 
-✅ USE CASE 6: Validated Strict Schema
-python
-Copy
-Edit
 class ValidatedOrder(BaseModel):
     """
     ✅ STRICT MODE COMPATIBLE WITH VALIDATION
@@ -208,31 +220,124 @@ class ValidatedOrder(BaseModel):
         if v < 0:
             raise ValueError('Amount cannot be negative')
         return v
-✅ Why use it?
-Combine schema validation with custom rules
 
-Crucial for financial systems, ecommerce, logistics
+# ✅ Why use it?
+# Combine schema validation with custom rules
+
+# Crucial for financial systems, ecommerce, logistics
 
-Would you like me to continue with:
 
-✅ Use Case 7: Mixed Types and Union Strategies
 
-✅ Use Case 8: AgentOutputSchema Integration + Live Agent Demo
 
-I can also generate .py files and a PDF summary for all use cases.
+# =============================================================================
+# USE CASE 7: Mixed Types with Union Strategies (Strict-Compatible)
+# =============================================================================
 
 
+class TextBlock(BaseModel):
+    kind: Literal["text"] = "text"
+    text: str = ""
 
+    model_config = ConfigDict(extra="forbid")
 
 
+class CodeBlock(BaseModel):
+    kind: Literal["code"] = "code"
+    language: str = ""
+    code: str = ""
 
+    model_config = ConfigDict(extra="forbid")
 
 
+class MixedContentResponse(BaseModel):
+    """
+    ✅ STRICT MODE COMPATIBLE
+    - Union of MODELS (not Optional/Any) becomes `anyOf` in the schema
+    - A Literal `kind` field tells the blocks apart
+    - Flexible output shape without giving up strict mode
+    """
+    title: str = ""
+    blocks: List[Union[TextBlock, CodeBlock]] = Field(default_factory=list)
 
+    model_config = ConfigDict(extra="forbid")
 
+# ✅ Why use it?
+# Answers that mix prose and code (or any "one of several shapes" data)
 
-Tools
 
 
 
-ChatGPT can make mistakes. Check important info.
\ No newline at end of file
+# =============================================================================
+# USE CASE 8: AgentOutputSchema Integration (Opting Out of Strict Mode)
+# =============================================================================
+# FlexibleAnalysis (Use Case 5) cannot pass strict mode, so Agent(output_type=FlexibleAnalysis)
+# raises. Wrapping it in AgentOutputSchema(..., strict_json_schema=False) tells the SDK to
+# send a non-strict schema instead; the schema registry (below) builds that wrapper once
+# and shares it.
+
+flexible_output = output_schema(FlexibleAnalysis, strict=False)
+
+analysis_agent = Agent(
+    name="AnalysisAgent",
+    instructions="Analyze the text and report results, confidence and any errors.",
+    output_type=flexible_output,
+)
+
+# ⚠️ Trade-off:
+# The model is no longer forced to follow the schema, so expect more validation failures
+
+
+
+
+# =============================================================================
+# ⚡ Reusing compiled schemas (schema_registry.py)
+# =============================================================================
+# Agent(output_type=SomeModel) rebuilds the schema + validator every turn.
+# Build each one once at startup and hand the agent the shared instance instead.
+
+# Every output type used above; bare classes are strict, (type, False) is non-strict
+OUTPUT_TYPES = [
+    BasicUserInfo,
+    TaskClassification,
+    ComplexUserProfile,
+    StudentTranscript,
+    ValidatedOrder,
+    MixedContentResponse,
+    (FlexibleAnalysis, False),  # non-strict only
+]
+
+
+def make_transcript_agent() -> Agent:
+    # Safe to call per request: no schema work happens here after warmup
+    return Agent(
+        name="TranscriptAgent",
+        instructions="Extract the student's transcript from the text.",
+        output_type=output_schema(StudentTranscript),
+    )
+
+
+# 🌊 Streaming: show each CourseGrade as soon as it is generated (streaming_output.py)
+from streaming_output import FieldParsed, ItemParsed, stream_structured
+
+
+async def stream_transcript_demo(text: str):
+    async for event in stream_structured(make_transcript_agent(), text, StudentTranscript):
+        if isinstance(event, ItemParsed):
+            print(f"  course #{event.index + 1}: {event.value}")
+        elif isinstance(event, FieldParsed):
+            print(f"  {event.name} = {event.value!r}")
+
+
+async def main():
+    print("Schema warmup (seconds):", warmup(OUTPUT_TYPES))
+    result = await Runner.run(
+        make_transcript_agent(),
+        "Ali (id S-17) took Math (A, 3 credits) and Physics (B+, 4 credits). GPA 3.6, still enrolled.",
+    )
+    print(result.final_output)
+    # await stream_transcript_demo("Sara (id S-42): Chemistry A 4cr, Biology B 3cr, Art A- 2cr. GPA 3.5.")
+    print(stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
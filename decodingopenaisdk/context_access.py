@@ -0,0 +1,348 @@
+"""
+Versioned, Lock-Aware Context Access
+
+Tools that mutate `ctx.context` directly are only safe if tool calls run one at a time.
+This module makes concurrent tool calls safe AND lets independent ones overlap:
+
+1. VersionedContext
+   - Every field carries a version number
+   - Tools work on a private copy of the fields they touch (snapshot)
+   - Changes are published with compare-and-swap (CAS): if any field they read
+     changed meanwhile, the work is retried on a fresh snapshot
+   - The commit lock is held only for the version check, never while a tool runs
+
+2. Read/write sets
+   - `@declare_access(reads=..., writes=...)` records which fields a tool touches
+   - Two calls conflict if one writes a field the other reads or writes
+
+3. Scheduling
+   - The SDK Runner already starts all tool calls of a turn concurrently
+   - `guard_tools()` wraps each tool so it holds per-field read/write locks (from its
+     declaration) while it runs: calls touching different fields overlap, conflicting
+     ones wait for each other, in arrival order
+   - Locks are per run context (`ctx.context`): runs and sessions sharing one agent
+     never wait for each other, only calls on the same context do
+
+        agent = Agent(..., tools=guard_tools([add_task, get_status, ...]))
+"""
+
+import asyncio
+import copy
+import dataclasses
+import threading
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Iterable
+
+
+class ContextConflictError(RuntimeError):
+    """Raised when a transaction keeps losing the CAS race after all retries."""
+
+
+# =============================================================================
+# Versioned Context (optimistic concurrency)
+# =============================================================================
+
+
+class VersionedContext:
+    """
+    Base class for contexts whose fields are updated with optimistic CAS.
+
+    Field values are shallow-copied into each transaction, so keep them as
+    containers of immutable items (list[str], dict[str, str], ...).
+    """
+
+    def __init__(self):
+        self._values: dict[str, Any] = {}
+        self._versions: dict[str, int] = {}
+        self._commit_lock = threading.Lock()
+        self.commits = 0
+        self.retries = 0
+
+    def define(self, name: str, value: Any):
+        self._values[name] = value
+        self._versions[name] = 0
+
+    def get(self, name: str) -> Any:
+        """Current committed value (read-only view, do not mutate)."""
+        return self._values[name]
+
+    def version(self, name: str) -> int:
+        return self._versions[name]
+
+    def to_state(self) -> dict[str, Any]:
+        """Committed field values (used by context_codec to save the context)."""
+        fields, _ = self.snapshot(self._values)
+        return fields
+
+    def load_state(self, state: dict[str, Any]):
+        for name, value in state.items():
+            self.define(name, value)
+
+    def snapshot(self, names: Iterable[str]) -> tuple[dict[str, Any], dict[str, int]]:
+        with self._commit_lock:
+            values = {name: copy.copy(self._values[name]) for name in names}
+            versions = {name: self._versions[name] for name in values}
+        return values, versions
+
+    def compare_and_swap(self, expected: dict[str, int], updates: dict[str, Any]) -> bool:
+        """Publish `updates` only if every field in `expected` is still at that version."""
+        with self._commit_lock:
+            for name, version in expected.items():
+                if self._versions[name] != version:
+                    return False
+            for name, value in updates.items():
+                self._values[name] = value
+                self._versions[name] += 1
+            self.commits += 1
+            return True
+
+    def transact(
+        self,
+        fn: Callable[[dict[str, Any]], Any],
+        reads: Iterable[str] = (),
+        writes: Iterable[str] = (),
+        max_retries: int = 16,
+    ) -> Any:
+        """
+        Run `fn(fields)` on a private snapshot and commit the written fields.
+
+        `fn` may mutate the snapshot values in place or reassign keys of `fields`.
+        It can run more than once, so it must not have outside side effects.
+        """
+        writes = tuple(writes)
+        names = set(reads) | set(writes)
+        for _ in range(max_retries + 1):
+            values, versions = self.snapshot(names)
+            result = fn(values)
+            if self.compare_and_swap(versions, {name: values[name] for name in writes}):
+                return result
+            self.retries += 1
+        raise ContextConflictError(f"Gave up after {max_retries} retries on fields {sorted(names)}")
+
+
+# =============================================================================
+# Tool read/write sets
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class ToolAccess:
+    reads: frozenset[str] = field(default_factory=frozenset)
+    writes: frozenset[str] = field(default_factory=frozenset)
+
+    def conflicts_with(self, other: "ToolAccess") -> bool:
+        return bool(
+            self.writes & (other.reads | other.writes)
+            or other.writes & self.reads
+        )
+
+
+# Tools without a declaration are treated as touching everything
+UNKNOWN_ACCESS = None
+
+TOOL_ACCESS: dict[str, ToolAccess] = {}
+
+
+def declare_access(reads: Iterable[str] = (), writes: Iterable[str] = ()):
+    """
+    Record the fields a tool touches. Works on top of @function_tool or a plain function:
+
+        @declare_access(writes={"task_queue"})
+        @function_tool
+        def add_task(ctx, task: str) -> str: ...
+    """
+    access = ToolAccess(frozenset(reads), frozenset(writes))
+
+    def decorator(tool):
+        name = getattr(tool, "name", None) or tool.__name__
+        TOOL_ACCESS[name] = access
+        return tool
+
+    return decorator
+
+
+# =============================================================================
+# Per-field locks for concurrent tool calls
+# =============================================================================
+
+
+class _ReadWriteLock:
+    """asyncio lock with many readers or one writer; waiters are served in arrival order."""
+
+    def __init__(self):
+        self._readers = 0
+        self._writer = False
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()
+
+    def _free_for(self, write: bool) -> bool:
+        return not self._writer and (not write or self._readers == 0)
+
+    def _take(self, write: bool):
+        if write:
+            self._writer = True
+        else:
+            self._readers += 1
+
+    async def acquire(self, write: bool):
+        if not self._waiters and self._free_for(write):
+            self._take(write)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((write, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(write)  # granted just as we were cancelled
+            else:
+                self._waiters.remove((write, waiter))
+                self._wake()
+            raise
+
+    def release(self, write: bool):
+        if write:
+            self._writer = False
+        else:
+            self._readers -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._free_for(self._waiters[0][0]):
+            write, waiter = self._waiters.popleft()
+            self._take(write)
+            waiter.set_result(None)
+
+
+class ToolLocks:
+    """
+    One read/write lock per context field. Locks are always taken in the same order
+    (everything-lock first, then field names sorted), so two calls can never deadlock.
+    """
+
+    EVERYTHING = "*"  # undeclared tools write it; declared tools read it
+
+    def __init__(self):
+        self._locks: dict[str, _ReadWriteLock] = {}
+
+    @asynccontextmanager
+    async def hold(self, access: ToolAccess | None) -> AsyncIterator[None]:
+        if access is UNKNOWN_ACCESS:
+            plan = [(self.EVERYTHING, True)]
+        else:
+            fields = sorted(access.reads | access.writes)
+            plan = [(self.EVERYTHING, False)] + [(name, name in access.writes) for name in fields]
+        held: list[tuple[_ReadWriteLock, bool]] = []
+        try:
+            for name, write in plan:
+                lock = self._locks.setdefault(name, _ReadWriteLock())
+                await lock.acquire(write)
+                held.append((lock, write))
+            yield
+        finally:
+            for lock, write in reversed(held):
+                lock.release(write)
+
+
+class ContextLocks:
+    """
+    One ToolLocks per context object, dropped when the context is garbage-collected.
+    Keyed by identity (contexts are often unhashable dataclasses or pydantic models);
+    contexts that can't be weakly referenced (None, dict, ...) share one ToolLocks.
+    """
+
+    def __init__(self):
+        self._by_id: dict[int, tuple[weakref.ref, ToolLocks]] = {}
+        self._shared = ToolLocks()
+
+    def for_context(self, context: Any) -> ToolLocks:
+        if context is None:
+            return self._shared
+        key = id(context)
+        entry = self._by_id.get(key)
+        if entry is not None and entry[0]() is context:
+            return entry[1]
+        try:
+            ref = weakref.ref(context, lambda _, key=key: self._by_id.pop(key, None))
+        except TypeError:  # not weak-referenceable
+            return self._shared
+        locks = ToolLocks()
+        self._by_id[key] = (ref, locks)
+        return locks
+
+
+def guard_tools(tools: list[Any], locks: ToolLocks | None = None) -> list[Any]:
+    """
+    Copies of the FunctionTools whose invocation holds the locks of their declared fields
+    on the run's context (pass `locks` to share one set across all contexts instead).
+    Tools without a @declare_access run alone (per context).
+    """
+    by_context = ContextLocks()
+    guarded = []
+    for tool in tools:
+        access = TOOL_ACCESS.get(tool.name, UNKNOWN_ACCESS)
+
+        async def on_invoke_tool(ctx: Any, input_json: str, _invoke: Callable = tool.on_invoke_tool,
+                                 _access: ToolAccess | None = access) -> Any:
+            held = locks or by_context.for_context(getattr(ctx, "context", None))
+            async with held.hold(_access):
+                return await _invoke(ctx, input_json)
+
+        guarded.append(dataclasses.replace(tool, on_invoke_tool=on_invoke_tool))
+    return guarded
+
+
+# 🧪 Overlap vs serialization with stand-in tools: python context_access.py
+if __name__ == "__main__":
+    import time
+
+    @dataclass
+    class FakeTool:  # the two fields of agents.FunctionTool that guard_tools uses
+        name: str
+        on_invoke_tool: Callable
+
+    async def invoke(ctx: Any, input_json: str) -> str:
+        await asyncio.sleep(0.1)
+        return input_json
+
+    def slow_tool(name: str, reads: Iterable[str] = (), writes: Iterable[str] = ()) -> FakeTool:
+        return declare_access(reads, writes)(FakeTool(name, invoke))
+
+    tools = {tool.name: tool for tool in guard_tools([
+        slow_tool("add_task", writes={"task_queue"}),
+        slow_tool("complete_task", writes={"task_queue", "completed_tasks"}),
+        slow_tool("update_profile", writes={"user_profile"}),
+        slow_tool("remember_fact", writes={"conversation_memory"}),
+        slow_tool("get_profile", reads={"user_profile"}),
+        slow_tool("get_profile_again", reads={"user_profile"}),
+        FakeTool("undeclared", invoke),
+    ])}
+
+    class RunContext:  # stands in for agents.RunContextWrapper
+        def __init__(self, context: Any):
+            self.context = context
+
+    session_a, session_b = RunContext(VersionedContext()), RunContext(VersionedContext())
+
+    async def batch(names: list[str], contexts: Iterable[RunContext] | None = None) -> float:
+        contexts = contexts or [session_a] * len(names)
+        started = time.perf_counter()
+        await asyncio.gather(*(tools[name].on_invoke_tool(ctx, "{}") for name, ctx in zip(names, contexts)))
+        return time.perf_counter() - started
+
+    async def demo():
+        for names in (
+            ["add_task", "update_profile", "remember_fact"],  # disjoint fields: overlap
+            ["add_task", "complete_task", "update_profile"],  # task_queue twice: 2 rounds
+            ["get_profile", "get_profile_again"],  # readers share the lock
+            ["update_profile", "get_profile", "get_profile_again"],  # writer, then both readers
+            ["add_task", "undeclared", "update_profile"],  # undeclared runs alone
+        ):
+            print(f"{await batch(names) * 1000:4.0f} ms  {names}")
+        # Same conflicting calls, but from two sessions sharing the agent: no waiting
+        names = ["add_task", "add_task"]
+        print(f"{await batch(names, [session_a, session_b]) * 1000:4.0f} ms  {names} (two sessions)")
+
+    asyncio.run(demo())
@@ -0,0 +1,332 @@
+"""
+Fast Binary Serialization for Run Contexts and Transcripts
+
+Pretty-printed JSON (`json.dump(history, indent=2)`) is easy to read but slow and large.
+This module stores contexts and input lists (`result.to_input_list()`) as:
+
+    MAGIC (4 bytes) | schema version (uint16) | flags (uint8) | payload
+
+- payload is MessagePack when the `msgpack` package is installed (C extension:
+  smaller and faster than json), otherwise compact JSON (flags bit 1)
+- flags bit 0 = payload is zstd-compressed (needs the `zstandard` package)
+- schema version lets old blobs be upgraded with registered migrations on load
+
+msgpack and zstandard are optional and NOT installed with this project
+(`pip install msgpack zstandard` to get them). Without them the payload IS compact
+JSON: the same size and speed as `json.dumps(obj, separators=(",", ":"))`. The gain
+over pretty-printed JSON then comes from dropping the indentation, and the envelope
+only adds versioning and the extra types below. A pure-Python MessagePack encoder
+would be slower than the C-accelerated stdlib json, so there is none.
+
+Extra types beyond JSON: bytes, tuple (as list), set/frozenset, datetime and ints
+outside the 64-bit range. Dict keys must be strings in both formats (JSON would turn
+{1: "a"} into {"1": "a"} while MessagePack keeps the int), so other keys are rejected.
+
+Run `python context_codec.py` for a size/speed benchmark against stdlib json.
+"""
+
+import base64
+import json
+import struct
+from datetime import datetime
+from typing import Any, Callable, TypeVar
+
+try:
+    import msgpack
+except ImportError:  # optional: compact JSON payloads without it
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for compress=True
+    zstandard = None
+
+
+MAGIC = b"AGC1"
+SCHEMA_VERSION = 1
+FLAG_ZSTD = 0x01
+FLAG_JSON = 0x02
+
+_HEADER = struct.Struct(">4sHB")
+
+# Extension type codes (MessagePack ext types; "__ext__" objects in JSON payloads)
+_EXT_SET = 1
+_EXT_DATETIME = 2
+_EXT_BIGINT = 3
+_EXT_BYTES = 4  # JSON only: MessagePack has a native bin type
+
+
+class CodecError(ValueError):
+    """Raised for blobs that are corrupt, unknown, or cannot be migrated."""
+
+
+_CONTAINERS = (dict, list, tuple)
+
+
+def _check_keys(obj: Any):
+    """Raise TypeError for non-str dict keys anywhere in `obj`, so both formats round-trip alike."""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            for key in item:
+                if type(key) is not str:
+                    raise TypeError(f"Dict keys must be str, got {type(key).__name__} key {key!r}")
+            item = item.values()
+        elif not isinstance(item, (list, tuple)):
+            continue
+        stack.extend([value for value in item if isinstance(value, _CONTAINERS)])
+
+
+def _model_state(obj: Any) -> dict[str, Any]:
+    state = obj.model_dump()
+    _check_keys(state)
+    return state
+
+
+# =============================================================================
+# MessagePack payloads
+# =============================================================================
+
+
+def _ext_encode(obj: Any) -> tuple[int, bytes]:
+    if isinstance(obj, (set, frozenset)):
+        return _EXT_SET, packb(sorted(obj, key=repr))
+    if isinstance(obj, datetime):
+        return _EXT_DATETIME, obj.isoformat().encode("utf-8")
+    if isinstance(obj, int):  # msgpack hands over ints outside the 64-bit range
+        return _EXT_BIGINT, str(obj).encode("ascii")
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def _ext_decode(code: int, data: bytes) -> Any:
+    if code == _EXT_SET:
+        return set(unpackb(data))
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_BIGINT:
+        return int(data)
+    raise CodecError(f"Unknown extension type {code}")
+
+
+def _default(obj: Any) -> Any:
+    """Turn non-native objects into something msgpack can pack."""
+    if hasattr(obj, "model_dump"):
+        return _model_state(obj)
+    return msgpack.ExtType(*_ext_encode(obj))
+
+
+def packb(obj: Any) -> bytes:
+    """Encode one object as MessagePack (requires the msgpack package)."""
+    if msgpack is None:
+        raise RuntimeError("MessagePack payloads require the 'msgpack' package")
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode one MessagePack object."""
+    if msgpack is None:
+        raise RuntimeError("Blob has a MessagePack payload; install the 'msgpack' package")
+    try:
+        return msgpack.unpackb(data, raw=False, ext_hook=_ext_decode, strict_map_key=False)
+    except CodecError:
+        raise
+    except (ValueError, msgpack.UnpackException) as e:
+        raise CodecError(f"Corrupt MessagePack payload ({type(e).__name__})") from e
+
+
+# =============================================================================
+# JSON payloads (fallback without msgpack)
+# =============================================================================
+
+
+def _json_default(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        return _model_state(obj)
+    if isinstance(obj, (set, frozenset)):
+        return {"__ext__": _EXT_SET, "v": sorted(obj, key=repr)}
+    if isinstance(obj, datetime):
+        return {"__ext__": _EXT_DATETIME, "v": obj.isoformat()}
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {"__ext__": _EXT_BYTES, "v": base64.b64encode(bytes(obj)).decode("ascii")}
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def _json_object_hook(obj: dict[str, Any]) -> Any:
+    code = obj.get("__ext__")
+    if code is None or len(obj) != 2:
+        return obj
+    if code == _EXT_SET:
+        return set(obj["v"])
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(obj["v"])
+    if code == _EXT_BYTES:
+        return base64.b64decode(obj["v"])
+    raise CodecError(f"Unknown extension type {code}")
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    try:
+        return json.loads(data, object_hook=_json_object_hook)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise CodecError(f"Corrupt JSON payload: {e}") from e
+
+
+# =============================================================================
+# Versioned envelope
+# =============================================================================
+
+# (kind, from_version) -> function that upgrades a payload to from_version + 1
+_MIGRATIONS: dict[tuple[str, int], Callable[[Any], Any]] = {}
+
+
+def register_migration(kind: str, from_version: int):
+    """Decorator: upgrade payloads of `kind` stored at `from_version` by one version."""
+
+    def decorator(fn: Callable[[Any], Any]):
+        _MIGRATIONS[(kind, from_version)] = fn
+        return fn
+
+    return decorator
+
+
+def dumps(obj: Any, kind: str = "raw", schema_version: int = SCHEMA_VERSION, compress: bool = False) -> bytes:
+    """Serialize `obj` into a versioned binary blob."""
+    envelope = {"kind": kind, "data": obj}
+    _check_keys(obj)
+    if msgpack is not None:
+        payload, flags = packb(envelope), 0
+    else:
+        payload, flags = _json_dumps(envelope), FLAG_JSON
+    if compress:
+        if zstandard is None:
+            raise RuntimeError("compress=True requires the 'zstandard' package")
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+        flags |= FLAG_ZSTD
+    return _HEADER.pack(MAGIC, schema_version, flags) + payload
+
+
+def loads(blob: bytes, kind: str | None = None, schema_version: int = SCHEMA_VERSION) -> Any:
+    """Deserialize a blob, running migrations up to `schema_version`."""
+    if len(blob) < _HEADER.size:
+        raise CodecError("Blob is too short")
+    magic, version, flags = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise CodecError("Not a context_codec blob")
+    if version > schema_version:
+        raise CodecError(f"Blob schema v{version} is newer than supported v{schema_version}")
+
+    payload = blob[_HEADER.size:]
+    if flags & FLAG_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed; install the 'zstandard' package")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+
+    envelope = _json_loads(payload) if flags & FLAG_JSON else unpackb(payload)
+    if not (isinstance(envelope, dict) and isinstance(envelope.get("kind"), str) and "data" in envelope):
+        raise CodecError("Blob payload is not a codec envelope")
+    if kind is not None and envelope["kind"] != kind:
+        raise CodecError(f"Expected a '{kind}' blob, got '{envelope['kind']}'")
+
+    data = envelope["data"]
+    while version < schema_version:
+        migrate = _MIGRATIONS.get((envelope["kind"], version))
+        if migrate is None:
+            raise CodecError(f"No migration for '{envelope['kind']}' from v{version}")
+        data = migrate(data)
+        version += 1
+    return data
+
+
+# =============================================================================
+# Contexts and transcripts
+# =============================================================================
+
+C = TypeVar("C")
+
+
+def context_state(ctx: Any) -> dict[str, Any]:
+    """Public state of a context object (`to_state()` if it defines one)."""
+    if hasattr(ctx, "to_state"):
+        return ctx.to_state()
+    return {name: value for name, value in vars(ctx).items() if not name.startswith("_")}
+
+
+def dump_context(ctx: Any, compress: bool = False) -> bytes:
+    return dumps(context_state(ctx), kind=f"context:{type(ctx).__name__}", compress=compress)
+
+
+def load_context(blob: bytes, factory: Callable[[], C]) -> C:
+    """Rebuild a context: `factory()` makes a fresh one, then the saved state is applied."""
+    ctx = factory()
+    state = loads(blob, kind=f"context:{type(ctx).__name__}")
+    if hasattr(ctx, "load_state"):
+        ctx.load_state(state)
+    else:
+        for name, value in state.items():
+            setattr(ctx, name, value)
+    return ctx
+
+
+def dump_transcript(input_list: list[Any], compress: bool = False) -> bytes:
+    """Serialize an input list such as `result.to_input_list()` or a chat history."""
+    return dumps(list(input_list), kind="transcript", compress=compress)
+
+
+def load_transcript(blob: bytes) -> list[Any]:
+    return loads(blob, kind="transcript")
+
+
+# 🧪 Benchmark: python context_codec.py
+if __name__ == "__main__":
+    import timeit
+
+    history = []
+    for turn in range(200):
+        history.append({"role": "user", "content": f"Question {turn}: how do agents use tools?"})
+        history.append({
+            "id": f"msg_{turn:06d}",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": "Agents call tools when needed. " * 8, "annotations": []}],
+        })
+
+    candidates = {
+        "json indent=2": (lambda: json.dumps(history, indent=2).encode(), lambda b: json.loads(b)),
+        "json compact": (lambda: json.dumps(history, separators=(",", ":")).encode(), lambda b: json.loads(b)),
+        "codec": (lambda: dump_transcript(history), load_transcript),
+    }
+    if zstandard is not None:
+        candidates["codec+zstd"] = (lambda: dump_transcript(history, compress=True), load_transcript)
+
+    print(f"backend: {'msgpack' if msgpack is not None else 'json (msgpack not installed)'}; {len(history)} items")
+    print(f"{'format':<16}{'bytes':>10}{'dump ms':>10}{'load ms':>10}")
+    for name, (dump, load) in candidates.items():
+        blob = dump()
+        assert load(blob) == history
+        dump_ms = timeit.timeit(dump, number=20) / 20 * 1000
+        load_ms = timeit.timeit(lambda: load(blob), number=20) / 20 * 1000
+        print(f"{name:<16}{len(blob):>10}{dump_ms:>10.2f}{load_ms:>10.2f}")
+
+    # Non-str keys are rejected whichever backend is installed; malformed envelopes are CodecErrors
+    for bad in ({1: "a"}, [{"ok": {(1, 2): "tuple key"}}]):
+        try:
+            dumps(bad)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError(f"non-str key accepted: {bad}")
+    for blob in (_HEADER.pack(MAGIC, SCHEMA_VERSION, FLAG_JSON) + b"[1]",
+                 _HEADER.pack(MAGIC, SCHEMA_VERSION, FLAG_JSON) + b'{"kind": 1, "data": 2}'):
+        try:
+            loads(blob)
+        except CodecError:
+            pass
+        else:
+            raise AssertionError(f"malformed envelope accepted: {blob!r}")
+    print("non-str keys and malformed envelopes rejected: ok")
@@ -0,0 +1,188 @@
+"""
+JSON Schema Minimizer for Output Types
+
+The output schema is sent with EVERY request. Nested models like ComplexUserProfile
+(→ BasicUserInfo / Address / ContactInfo) and enums like Priority expand into
+`$defs`, `$ref`s, titles, defaults and long descriptions the model does not need.
+
+`minimize_schema()` keeps the schema valid for strict mode and:
+- inlines `$defs` (recursive models keep their `$defs` entry)
+- drops `title` and `default` keywords (strict mode makes every field required anyway)
+- shortens descriptions to a character budget
+`schema_report()` shows how many tokens that saves.
+
+    from schema_registry import output_schema
+    agent = Agent(name="Profiles", output_type=output_schema(ComplexUserProfile, minimize=True))
+"""
+
+import copy
+import json
+from typing import Any
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a ~4 chars/token estimate
+    tiktoken = None
+
+from agents import AgentOutputSchemaBase
+
+
+_DROP_KEYWORDS = {"title", "default"}
+_SCHEMA_MAPS = {"properties", "$defs", "definitions", "patternProperties"}
+_SCHEMA_LISTS = {"anyOf", "oneOf", "allOf", "prefixItems"}
+_SCHEMA_VALUES = {"items", "additionalProperties", "not", "contains"}
+
+
+def _shorten(text: str, budget: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= budget:
+        return text
+    cut = text[: budget - 1].rsplit(" ", 1)[0] or text[: budget - 1]
+    return cut.rstrip(" ,.;:-") + "…"
+
+
+def _ref_name(ref: str) -> str | None:
+    for prefix in ("#/$defs/", "#/definitions/"):
+        if ref.startswith(prefix):
+            return ref[len(prefix):]
+    return None
+
+
+def _find_recursive(defs: dict[str, Any]) -> set[str]:
+    """Names of definitions that (directly or indirectly) reference themselves."""
+
+    def refs_in(node: Any, found: set[str]):
+        if isinstance(node, dict):
+            name = _ref_name(node.get("$ref", ""))
+            if name:
+                found.add(name)
+            for value in node.values():
+                refs_in(value, found)
+        elif isinstance(node, list):
+            for value in node:
+                refs_in(value, found)
+
+    graph = {}
+    for name, definition in defs.items():
+        found: set[str] = set()
+        refs_in(definition, found)
+        graph[name] = found
+
+    recursive = set()
+    for start in graph:
+        stack, seen = list(graph[start]), set()
+        while stack:
+            name = stack.pop()
+            if name == start:
+                recursive.add(start)
+                break
+            if name in seen or name not in graph:
+                continue
+            seen.add(name)
+            stack.extend(graph[name])
+    return recursive
+
+
+def minimize_schema(schema: dict[str, Any], description_budget: int = 80) -> dict[str, Any]:
+    """Return a smaller, equivalent copy of a (strict) JSON schema."""
+    defs = {**schema.get("definitions", {}), **schema.get("$defs", {})}
+    keep = _find_recursive(defs)
+
+    def walk(node: Any) -> Any:
+        if not isinstance(node, dict):
+            return node
+
+        name = _ref_name(node.get("$ref", ""))
+        if name is not None and name not in keep and name in defs:
+            # Inline the definition; sibling keywords (e.g. description) win over the def's
+            siblings = {k: v for k, v in node.items() if k != "$ref"}
+            node = {**copy.deepcopy(defs[name]), **siblings}
+            return walk(node)
+
+        result: dict[str, Any] = {}
+        for key, value in node.items():
+            if key in _DROP_KEYWORDS:
+                continue
+            if key in ("$defs", "definitions"):
+                continue  # re-added below for recursive models only
+            if key == "description" and isinstance(value, str):
+                if description_budget > 0:
+                    result[key] = _shorten(value, description_budget)
+            elif key in _SCHEMA_MAPS and isinstance(value, dict):
+                result[key] = {prop: walk(sub) for prop, sub in value.items()}
+            elif key in _SCHEMA_LISTS and isinstance(value, list):
+                result[key] = [walk(sub) for sub in value]
+            elif key in _SCHEMA_VALUES:
+                result[key] = walk(value)
+            else:
+                result[key] = value
+        return result
+
+    minimized = walk(schema)
+    if keep:
+        minimized["$defs"] = {name: walk(defs[name]) for name in sorted(keep)}
+    return minimized
+
+
+# =============================================================================
+# Token accounting
+# =============================================================================
+
+
+def count_tokens(schema: dict[str, Any], encoding: str = "o200k_base") -> int:
+    text = json.dumps(schema, separators=(",", ":"), ensure_ascii=False)
+    if tiktoken is not None:
+        return len(tiktoken.get_encoding(encoding).encode(text))
+    return (len(text) + 3) // 4
+
+
+def schema_report(schema: dict[str, Any], description_budget: int = 80) -> dict[str, int | float]:
+    minimized = minimize_schema(schema, description_budget)
+    before, after = count_tokens(schema), count_tokens(minimized)
+    return {
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": before - after,
+        "percent_saved": round(100 * (before - after) / before, 1) if before else 0.0,
+    }
+
+
+# =============================================================================
+# SDK integration
+# =============================================================================
+
+
+class MinimizedOutputSchema(AgentOutputSchemaBase):
+    """Wraps an output schema: sends the minimized JSON schema, validates with the original."""
+
+    def __init__(self, base: AgentOutputSchemaBase, description_budget: int = 80):
+        self._base = base
+        self._schema = minimize_schema(base.json_schema(), description_budget)
+
+    def is_plain_text(self) -> bool:
+        return self._base.is_plain_text()
+
+    def name(self) -> str:
+        return self._base.name()
+
+    def json_schema(self) -> dict[str, Any]:
+        return self._schema
+
+    def is_strict_json_schema(self) -> bool:
+        return self._base.is_strict_json_schema()
+
+    def validate_json(self, json_str: str) -> Any:
+        return self._base.validate_json(json_str)
+
+
+# 🧪 Report for the models in 06_structure.py: python schema_minimizer.py
+if __name__ == "__main__":
+    import importlib
+
+    from schema_registry import json_schema
+
+    structure = importlib.import_module("06_structure")
+    for item in structure.OUTPUT_TYPES:
+        output_type, strict = item if isinstance(item, tuple) else (item, True)
+        report = schema_report(json_schema(output_type, strict))
+        print(f"{output_type.__name__:<20} {report}")
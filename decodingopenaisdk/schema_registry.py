@@ -0,0 +1,124 @@
+"""
+Process-Wide Output Schema Registry
+
+`Agent(output_type=MyModel)` makes the SDK build a fresh AgentOutputSchema every turn.
+That means a new TypeAdapter (pydantic compiles a validator) plus JSON schema
+generation and the strict-mode rewrite, over and over for the same class.
+
+Passing a prebuilt AgentOutputSchema instance skips all of that, because the SDK
+uses AgentOutputSchemaBase instances as-is. This registry builds one per
+(output type, strict) pair, shares it process-wide and counts cache hits:
+
+    from schema_registry import output_schema, warmup
+
+    warmup([BasicUserInfo, StudentTranscript, (FlexibleAnalysis, False)])  # at startup
+    agent = Agent(name="Registrar", output_type=output_schema(StudentTranscript))
+
+`minimize=True` returns the token-trimmed variant from schema_minimizer.py (cached separately).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from agents import AgentOutputSchema, AgentOutputSchemaBase
+
+from schema_minimizer import MinimizedOutputSchema
+
+
+@dataclass
+class SchemaEntry:
+    output_schema: AgentOutputSchemaBase
+    build_seconds: float
+    hits: int = 0
+
+    @property
+    def json_schema(self) -> dict[str, Any]:
+        return self.output_schema.json_schema()
+
+
+class SchemaRegistry:
+    def __init__(self):
+        self._entries: dict[tuple[Any, bool, bool], SchemaEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, output_type: type[Any], strict: bool = True, minimize: bool = False) -> SchemaEntry:
+        key = (output_type, strict, minimize)
+        entry = self._entries.get(key)  # lock-free fast path
+        if entry is not None:
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                start = time.perf_counter()
+                schema = AgentOutputSchema(output_type, strict_json_schema=strict)
+                if minimize:
+                    schema = MinimizedOutputSchema(schema)
+                entry = SchemaEntry(schema, time.perf_counter() - start)
+                self._entries[key] = entry
+                self.misses += 1
+            else:
+                entry.hits += 1
+                self.hits += 1
+        return entry
+
+    def output_schema(
+        self, output_type: type[Any], strict: bool = True, minimize: bool = False
+    ) -> AgentOutputSchemaBase:
+        """Shared output schema to pass as `Agent(output_type=...)`."""
+        return self.entry(output_type, strict, minimize).output_schema
+
+    def json_schema(self, output_type: type[Any], strict: bool = True, minimize: bool = False) -> dict[str, Any]:
+        return self.entry(output_type, strict, minimize).json_schema
+
+    def validate_json(self, output_type: type[Any], json_str: str, strict: bool = True) -> Any:
+        return self.entry(output_type, strict).output_schema.validate_json(json_str)
+
+    def warmup(self, output_types: Iterable[type[Any] | tuple[type[Any], bool]]) -> dict[str, float]:
+        """
+        Build schemas up front. Items are a type (strict) or a (type, strict) pair.
+        Returns build time in seconds per type name.
+        """
+        timings: dict[str, float] = {}
+        for item in output_types:
+            output_type, strict = item if isinstance(item, tuple) else (item, True)
+            if (output_type, strict, False) in self._entries:
+                continue
+            entry = self.entry(output_type, strict)
+            timings[entry.output_schema.name()] = entry.build_seconds
+        return timings
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": {
+                f"{entry.output_schema.name()}{'' if strict else ' (non-strict)'}{' (minimized)' if minimize else ''}": {
+                    "hits": entry.hits,
+                    "build_ms": round(entry.build_seconds * 1000, 3),
+                }
+                for (_, strict, minimize), entry in self._entries.items()
+            },
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# One registry per process
+REGISTRY = SchemaRegistry()
+
+output_schema = REGISTRY.output_schema
+json_schema = REGISTRY.json_schema
+validate_json = REGISTRY.validate_json
+warmup = REGISTRY.warmup
+stats = REGISTRY.stats
@@ -0,0 +1,305 @@
+"""
+Incremental Streaming Parser for Structured Outputs
+
+Normally a structured output (e.g. StudentTranscript) can only be validated once the
+whole JSON has arrived. With large lists that means waiting for the LAST course
+before showing the FIRST one.
+
+This module scans the JSON text as deltas arrive and emits:
+- FieldParsed: a top-level field (e.g. `student_name`) as soon as its value is complete,
+  validated with the model's own field validators and Field(...) constraints
+- ItemParsed:  each element of a top-level list field (e.g. one CourseGrade), validated
+  as the item type (validators on the list field itself only run in finish())
+
+Invalid fields raise pydantic.ValidationError from feed(), before downstream code sees
+them. Model-level validators (@model_validator) only run in finish().
+
+Perceived latency drops from "full generation time" to "time to first item".
+
+    async for event in stream_structured(agent, "...", StudentTranscript):
+        if isinstance(event, ItemParsed):
+            print("course:", event.value)
+"""
+
+import bisect
+import json
+import typing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Generic, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@dataclass
+class FieldParsed:
+    name: str
+    value: Any
+
+
+@dataclass
+class ItemParsed:
+    field: str
+    index: int
+    value: Any
+
+
+@dataclass
+class OutputComplete(Generic[M]):
+    value: M
+
+
+# =============================================================================
+# Character-level JSON scanner
+# =============================================================================
+
+
+class _Frame:
+    __slots__ = ("kind", "expect_key", "key", "value_start", "index")
+
+    def __init__(self, kind: str):
+        self.kind = kind  # "{" or "["
+        self.expect_key = kind == "{"
+        self.key: str | None = None
+        self.value_start: int | None = None
+        self.index = 0
+
+
+class JSONEventScanner:
+    """
+    Finds where top-level fields and top-level list items start and end.
+
+    Only structure is tracked here (depth, strings, escapes), no parsing,
+    so each character is looked at once. Completed values are returned as raw
+    JSON slices: ("field", key, raw) or ("item", key, index, raw).
+
+    Deltas are kept as a list of chunks (appending to one growing string would copy
+    the whole text on every delta); slices are joined from the chunks they span.
+    """
+
+    _LITERAL_END = set(",}] \t\r\n")
+
+    def __init__(self):
+        self._chunks: list[str] = []
+        self._chunk_starts: list[int] = []  # offset of each chunk in the whole text
+        self._length = 0
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._string_start = 0
+        self._in_literal = False
+
+    @property
+    def buffer(self) -> str:
+        """All text fed so far."""
+        if len(self._chunks) > 1:
+            self._chunks, self._chunk_starts = ["".join(self._chunks)], [0]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        first = bisect.bisect_right(self._chunk_starts, start) - 1
+        last = bisect.bisect_left(self._chunk_starts, end)
+        offset = self._chunk_starts[first]
+        return "".join(self._chunks[first:last])[start - offset:end - offset]
+
+    def feed(self, delta: str) -> list[tuple]:
+        if not delta:
+            return []
+        base = self._length
+        self._chunks.append(delta)
+        self._chunk_starts.append(base)
+        self._length += len(delta)
+        events: list[tuple] = []
+        stack = self._stack
+
+        for i, c in enumerate(delta, base):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        stack[-1].key = json.loads(self._slice(self._string_start, i + 1))
+                        stack[-1].expect_key = False
+                    else:
+                        self._value_done(i + 1, events)
+                continue
+
+            if self._in_literal:
+                if c not in self._LITERAL_END:
+                    continue
+                self._in_literal = False
+                self._value_done(i, events)
+
+            if c in " \t\r\n":
+                continue
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = bool(stack) and stack[-1].kind == "{" and stack[-1].expect_key
+                if not self._string_is_key:
+                    self._value_start(i)
+            elif c == "{" or c == "[":
+                self._value_start(i)
+                stack.append(_Frame(c))
+            elif c == "}" or c == "]":
+                stack.pop()
+                self._value_done(i + 1, events)
+            elif c == ",":
+                if stack and stack[-1].kind == "{":
+                    stack[-1].expect_key = True
+            elif c == ":":
+                pass
+            else:
+                self._in_literal = True  # number, true, false, null
+                self._value_start(i)
+
+        return events
+
+    def _value_start(self, i: int):
+        if self._stack:
+            self._stack[-1].value_start = i
+
+    def _value_done(self, end: int, events: list[tuple]):
+        stack = self._stack
+        if not stack:
+            return  # root value finished
+        frame = stack[-1]
+        raw = self._slice(frame.value_start, end)
+        if len(stack) == 1 and frame.kind == "{":
+            events.append(("field", frame.key, raw))
+        elif len(stack) == 2 and frame.kind == "[" and stack[0].kind == "{":
+            events.append(("item", stack[0].key, frame.index, raw))
+        if frame.kind == "[":
+            frame.index += 1
+
+
+# =============================================================================
+# Model-aware parser
+# =============================================================================
+
+
+def _list_item_type(annotation: Any) -> Any | None:
+    origin = typing.get_origin(annotation)
+    if origin in (list, typing.List):
+        args = typing.get_args(annotation)
+        return args[0] if args else Any
+    return None
+
+
+class StreamingModelParser(Generic[M]):
+    """Feed text deltas, get validated FieldParsed / ItemParsed events back."""
+
+    def __init__(self, model_cls: type[M]):
+        self.model_cls = model_cls
+        self._scanner = JSONEventScanner()
+        self._fields: dict[str, str] = {}  # JSON key → attribute name of scalar fields
+        self._item_adapters: dict[str, TypeAdapter] = {}
+        for name, info in model_cls.model_fields.items():
+            key = info.alias or name
+            item_type = _list_item_type(info.annotation)
+            if item_type is not None:
+                self._item_adapters[key] = TypeAdapter(item_type)
+            else:
+                self._fields[key] = name
+        # Fields are validated by assigning them to an unvalidated instance through the
+        # model's own validator, so Field(...) constraints and @field_validators run too
+        self._partial = model_cls.model_construct()
+
+    def feed(self, delta: str) -> list[FieldParsed | ItemParsed]:
+        events: list[FieldParsed | ItemParsed] = []
+        for event in self._scanner.feed(delta):
+            if event[0] == "field":
+                _, key, raw = event
+                name = self._fields.get(key)
+                if name is not None:  # list fields are reported item by item
+                    events.append(FieldParsed(key, self._validate_field(name, raw)))
+            else:
+                _, key, index, raw = event
+                adapter = self._item_adapters.get(key)
+                if adapter is not None:
+                    events.append(ItemParsed(key, index, adapter.validate_json(raw)))
+        return events
+
+    def _validate_field(self, name: str, raw: str) -> Any:
+        self.model_cls.__pydantic_validator__.validate_assignment(self._partial, name, json.loads(raw))
+        return getattr(self._partial, name)
+
+    def finish(self) -> M:
+        """Validate the complete document (runs model-level validators too)."""
+        return self.model_cls.model_validate_json(self._scanner.buffer)
+
+
+async def stream_structured(agent: Any, input: Any, model_cls: type[M], **run_kwargs) -> AsyncIterator[
+    FieldParsed | ItemParsed | OutputComplete[M]
+]:
+    """
+    Run `agent` streamed and yield fields/items of its structured output early.
+    A stream that ends with incomplete or invalid JSON raises pydantic.ValidationError.
+    """
+    from agents import Runner
+    from openai.types.responses import ResponseTextDeltaEvent
+
+    parser = StreamingModelParser(model_cls)
+    result = Runner.run_streamed(agent, input, **run_kwargs)
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            for parsed in parser.feed(event.data.delta):
+                yield parsed
+    yield OutputComplete(parser.finish())
+
+
+# 🧪 Demo without a model: python streaming_output.py
+if __name__ == "__main__":
+    from pydantic import ConfigDict
+
+    class CourseGrade(BaseModel):
+        course_name: str = ""
+        grade: str = ""
+        credits: int = 0
+
+        model_config = ConfigDict(extra="forbid")
+
+    class StudentTranscript(BaseModel):
+        student_id: str = ""
+        student_name: str = ""
+        gpa: float = 0.0
+        courses: list[CourseGrade] = []
+
+    text = json.dumps({
+        "student_id": "S-17",
+        "student_name": "Ali \"The Quick\" Khan",
+        "gpa": 3.6,
+        "courses": [{"course_name": f"Course {n}", "grade": "A", "credits": 3} for n in range(3)],
+    })
+    parser = StreamingModelParser(StudentTranscript)
+    for start in range(0, len(text), 7):  # 7-char deltas, like a token stream
+        for event in parser.feed(text[start:start + 7]):
+            print(f"after {start + 7:>3} chars:", event)
+    print(parser.finish())
+
+    # Truncated output is reported by finish()
+    from pydantic import ValidationError
+
+    truncated = StreamingModelParser(StudentTranscript)
+    truncated.feed(text[: len(text) // 2])
+    try:
+        truncated.finish()
+    except ValidationError:
+        print("truncated stream: ValidationError from finish()")
+
+    # Cost per character stays flat as the output grows (no copying of the whole text per delta)
+    import time
+
+    for count in (1_000, 4_000):
+        big = json.dumps({"student_id": "S-1", "courses": [
+            {"course_name": f"Course {n}", "grade": "A", "credits": 3} for n in range(count)]})
+        parser = StreamingModelParser(StudentTranscript)
+        started = time.perf_counter()
+        items = sum(len(parser.feed(big[start:start + 4])) for start in range(0, len(big), 4))
+        assert items == count + 1 and len(parser.finish().courses) == count
+        print(f"{len(big) // 1000:>4} KB in 4-char deltas: {time.perf_counter() - started:.2f}s")
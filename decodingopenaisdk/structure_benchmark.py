@@ -0,0 +1,212 @@
+"""
+Benchmark Suite: Strict vs Non-Strict Structured Outputs
+
+Measures every use case in 06_structure.py so schema styles can be chosen with numbers:
+- schema_ms:          building the output schema (TypeAdapter + JSON schema + strict rewrite);
+                      for registry cases, getting the shared schema from a warmed
+                      SchemaRegistry (what building an Agent per request costs)
+- validate_per_sec:   validate_json() throughput on a realistic payload
+- bytes_per_instance: memory held by one validated instance (tracemalloc)
+- serialized_bytes:   size of model_dump_json()
+
+Results are written as JSON. With --baseline, any metric that got worse by more than
+--threshold percent is flagged and the exit code is 1 (usable in CI).
+
+    python structure_benchmark.py --output results.json
+    python structure_benchmark.py --save-baseline baseline.json
+    python structure_benchmark.py --baseline baseline.json --threshold 20
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any
+
+from agents import AgentOutputSchema
+
+from schema_registry import SchemaRegistry
+
+structure = importlib.import_module("06_structure")
+
+
+@dataclass
+class Case:
+    name: str
+    output_type: type
+    strict: bool
+    payload: dict[str, Any]
+    via_registry: bool = False  # schema and validation through SchemaRegistry
+
+
+CASES = [
+    Case("1_basic_strict", structure.BasicUserInfo, True,
+         {"name": "Ali", "age": 21, "is_student": True, "email": "ali@example.com"}),
+    Case("2_enum_strict", structure.TaskClassification, True,
+         {"task_type": "bug", "priority": "high", "estimated_hours": 3, "requires_review": True}),
+    Case("3_nested_strict", structure.ComplexUserProfile, True, {
+        "personal_info": {"name": "Sara", "age": 30, "is_student": False, "email": "sara@example.com"},
+        "address": {"street": "1 Main St", "city": "Karachi", "country": "PK", "postal_code": "74000"},
+        "contact": {"email": "sara@example.com", "phone": "+92-300-0000000"},
+        "registration_date": "2025-01-15",
+    }),
+    Case("4_list_strict", structure.StudentTranscript, True, {
+        "student_id": "S-17", "student_name": "Ali", "gpa": 3.6, "graduation_status": "enrolled",
+        "courses": [{"course_name": f"Course {i}", "grade": "A", "credits": 3} for i in range(20)],
+    }),
+    Case("5_flexible_nonstrict", structure.FlexibleAnalysis, False, {
+        "analysis_type": "sentiment", "confidence_score": 0.92,
+        "results": {"positive": 0.8, "negative": 0.2}, "metadata": {"model": "demo"},
+        "errors": None, "timestamp": "2025-01-15T10:00:00", "extra_note": "kept because extra=allow",
+    }),
+    Case("6_validated_strict", structure.ValidatedOrder, True, {
+        "order_id": "ORD-1", "customer_email": "buyer@example.com", "total_amount": 99.5,
+        "currency": "USD", "status": "confirmed",
+    }),
+    Case("7_union_strict", structure.MixedContentResponse, True, {
+        "title": "How to loop",
+        "blocks": [
+            {"kind": "text", "text": "Use a for loop:"},
+            {"kind": "code", "language": "python", "code": "for i in range(3):\n    print(i)"},
+            {"kind": "text", "text": "That prints 0, 1, 2."},
+        ],
+    }),
+    # `flexible_output` / analysis_agent: the non-strict wrapper as the agent gets it,
+    # i.e. looked up in the schema registry, validated through it
+    Case("8_agent_output_schema_registry", structure.FlexibleAnalysis, False, {
+        "analysis_type": "summary", "results": ["point one", "point two"],
+    }, via_registry=True),
+]
+
+# Direction of "better" for each metric
+HIGHER_IS_BETTER = {"validate_per_sec"}
+METRICS = ["schema_ms", "validate_per_sec", "bytes_per_instance", "serialized_bytes"]
+
+
+def _median_seconds(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_case(case: Case, validations: int, repeat: int) -> dict[str, float]:
+    if case.via_registry:
+        registry = SchemaRegistry()  # private: keeps the global registry's stats clean
+        registry.warmup([(case.output_type, case.strict)])
+
+        def build():
+            return registry.output_schema(case.output_type, case.strict)
+
+        def validate(raw: str) -> Any:
+            return registry.validate_json(case.output_type, raw, case.strict)
+    else:
+        def build():
+            return AgentOutputSchema(case.output_type, strict_json_schema=case.strict)
+
+        validate = build().validate_json
+
+    schema_ms = _median_seconds(build, repeat) * 1000
+    raw = json.dumps(case.payload)
+    validate(raw)  # warm caches
+
+    def validate_many():
+        for _ in range(validations):
+            validate(raw)
+
+    validate_per_sec = validations / _median_seconds(validate_many, repeat)
+
+    instances_count = 1000
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [validate(raw) for _ in range(instances_count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    bytes_per_instance = allocated / instances_count
+    del instances
+
+    serialized_bytes = len(validate(raw).model_dump_json().encode("utf-8"))
+
+    return {
+        "schema_ms": round(schema_ms, 4),
+        "validate_per_sec": round(validate_per_sec, 1),
+        "bytes_per_instance": round(bytes_per_instance, 1),
+        "serialized_bytes": serialized_bytes,
+    }
+
+
+def run_suite(validations: int = 5000, repeat: int = 5) -> dict[str, Any]:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "validations": validations,
+            "repeat": repeat,
+        },
+        "cases": {
+            case.name: {"strict": case.strict, **bench_case(case, validations, repeat)}
+            for case in CASES
+        },
+    }
+
+
+def find_regressions(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Metrics that got worse than the baseline by more than `threshold` percent."""
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if metric in HIGHER_IS_BETTER else (new - old) / old
+            if change * 100 > threshold:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change * 100:+.1f}% worse)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--validations", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.validations, args.repeat)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Local Vector Memory for Agents
+
+A tiny semantic memory store that lives entirely in-process:
+- Texts are turned into vectors by a local embedder (hashing by default, no API calls)
+- All vectors live in ONE contiguous float32 NumPy matrix
+- Recall is a single matrix-vector product + top-k selection (vectorized cosine)
+
+Why not just keep a list of strings?
+- A list must be capped (old facts get dropped) or sent wholesale to the model
+- With vector recall we keep everything and only hand the model the k most relevant items
+"""
+
+import hashlib
+import re
+import threading
+from typing import Protocol
+
+import numpy as np
+
+
+# =============================================================================
+# Embedders (pluggable)
+# =============================================================================
+
+
+class Embedder(Protocol):
+    """Anything with a fixed `dim` and an `embed(texts)` method can be used."""
+
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return a float32 array of shape (len(texts), dim)."""
+        ...
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    ✅ Zero-dependency local embedder (the "hashing trick")
+    - Words and character trigrams are hashed into `dim` buckets
+    - A second hash bit picks the sign, so collisions tend to cancel out
+    - Rows are L2-normalized, so a dot product IS the cosine similarity
+
+    blake2b is used instead of hash() because Python salts str hashes per process,
+    which would make stored vectors useless after a restart.
+
+    other data/samad/semantic_cache.py and Assignments/Raglearning/local_vector_store.py
+    are separate projects and carry the same code; change all three together.
+    """
+
+    def __init__(self, dim: int = 512, char_ngram: int = 3):
+        self.dim = dim
+        self.char_ngram = char_ngram
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        n = self.char_ngram
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+# =============================================================================
+# Vector Memory Store
+# =============================================================================
+
+
+class VectorMemory:
+    """
+    Append-only semantic memory with vectorized top-k cosine recall.
+
+    Storage is a preallocated (capacity, dim) float32 matrix that doubles when full,
+    so adding a fact is amortized O(dim) and recall never copies the whole store.
+    """
+
+    def __init__(self, embedder: Embedder | None = None, initial_capacity: int = 64):
+        self.embedder: Embedder = embedder or HashingEmbedder()
+        self._matrix = np.zeros((initial_capacity, self.embedder.dim), dtype=np.float32)
+        self._texts: list[str] = []
+        self._index: dict[str, int] = {}  # exact-duplicate guard
+        self._write_lock = threading.Lock()  # writers only; readers never block
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @property
+    def texts(self) -> list[str]:
+        return list(self._texts)
+
+    def _ensure_capacity(self, extra: int):
+        needed = len(self._texts) + extra
+        if needed <= self._matrix.shape[0]:
+            return
+        new_capacity = max(needed, self._matrix.shape[0] * 2)
+        grown = np.zeros((new_capacity, self._matrix.shape[1]), dtype=np.float32)
+        grown[: len(self._texts)] = self._matrix[: len(self._texts)]
+        self._matrix = grown
+
+    def add(self, text: str) -> int:
+        """Store a text and return its row id (existing id if already stored)."""
+        return self.add_many([text])[0]
+
+    def add_many(self, texts: list[str]) -> list[int]:
+        """Embed and store several texts in one batch."""
+        with self._write_lock:
+            return self._add_locked(texts)
+
+    def _add_locked(self, texts: list[str]) -> list[int]:
+        ids: list[int] = []
+        new_texts: list[str] = []
+        for text in texts:
+            if text in self._index:
+                ids.append(self._index[text])
+                continue
+            self._index[text] = len(self._texts) + len(new_texts)
+            ids.append(self._index[text])
+            new_texts.append(text)
+
+        if new_texts:
+            self._ensure_capacity(len(new_texts))
+            start = len(self._texts)
+            self._matrix[start:start + len(new_texts)] = self.embedder.embed(new_texts)
+            self._texts.extend(new_texts)
+        return ids
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> list[tuple[str, float]]:
+        """Return up to k (text, cosine_score) pairs, best first."""
+        n = len(self._texts)
+        if n == 0 or k <= 0:
+            return []
+
+        query_vec = self.embedder.embed([query])[0]
+        scores = self._matrix[:n] @ query_vec  # one BLAS call over all memories
+
+        k = min(k, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]  # O(n) selection, then sort only k
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(self._texts[i], float(scores[i])) for i in top if scores[i] > min_score]
+
+
+# 🧪 Quick demo: python vector_memory.py
+if __name__ == "__main__":
+    memory = VectorMemory()
+    memory.add_many([
+        "User's name is John and he is a Python developer",
+        "John has a meeting with Alice on Friday",
+        "Favorite programming language is Python",
+        "The ML project deadline is next Monday",
+    ])
+    for text, score in memory.search("when is the machine learning project due?", k=2):
+        print(f"{score:.3f}  {text}")
@@ -1,8 +1,8 @@
 import os
 from dotenv import load_dotenv
 import chainlit as cl
-from litellm import completion
-import json
+from model_router import ModelRoute, ModelRouter
+from transcript_sink import TranscriptSink
 
 # Load the environment variables from the .env file
 load_dotenv()
@@ -13,6 +13,20 @@ gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
 
+# Models to route between (comma-separated LiteLLM names); each request goes to the
+# currently fastest healthy one and falls back to the others if it fails
+models = os.getenv("LITELLM_MODELS", "gemini/gemini-2.0-flash,gemini/gemini-2.0-flash-lite")
+router = ModelRouter([
+    ModelRoute(name.strip(), {"api_key": gemini_api_key} if name.strip().startswith("gemini/") else {})
+    for name in models.split(",") if name.strip()
+])
+
+# Every turn is appended to transcripts/<session>.NNNN.jsonl by a background writer
+transcripts = TranscriptSink(
+    os.getenv("TRANSCRIPT_DIR", "transcripts"),
+    fsync=os.getenv("TRANSCRIPT_FSYNC", "interval"),
+)
+
 @cl.on_chat_start
 async def start():
     """Set up the chat session when a user connects."""
@@ -33,15 +47,12 @@ async def main(message: cl.Message):
     
     # Append the user's message to the history.
     history.append({"role": "user", "content": message.content})
+    await transcripts.append(cl.user_session.get("id"), {"role": "user", "content": message.content})
     
 
     try:
-        # Get completion from LiteLLM
-        response = completion(
-            model="gemini/gemini-2.0-flash",
-            api_key=gemini_api_key,
-            messages=history
-        )
+        # Get completion from LiteLLM (async: other sessions keep running meanwhile)
+        response, route = await router.complete(history)
         
         response_content = response.choices[0].message.content
         
@@ -51,6 +62,10 @@ async def main(message: cl.Message):
 
         # Append the assistant's response to the history.
         history.append({"role": "assistant", "content": response_content})
+        await transcripts.append(
+            cl.user_session.get("id"),
+            {"role": "assistant", "content": response_content, "model": route.model},
+        )
     
         # Update the session with the new history.
         cl.user_session.set("chat_history", history)
@@ -58,6 +73,7 @@ async def main(message: cl.Message):
         # Optional: Log the interaction
         print(f"User: {message.content}")
         print(f"Assistant: {response_content}")
+        print(f"Model: {route.model} {router.stats()[route.model]}")
         
     except Exception as e:
         msg.content = f"Error: {str(e)}"
@@ -65,13 +81,9 @@ async def main(message: cl.Message):
         print(f"Error: {str(e)}")
 
 
-# Right on it is not fully functioning because we are not
-# loading json file on on_chat_start
 @cl.on_chat_end
 async def on_chat_end():
-    # Retrieve the full chat history at the end of the session
-    history = cl.user_session.get("chat_history") or []
-    # Save the chat history to a file (or persist it elsewhere)
-    with open("chat_history.json", "w") as f:
-        json.dump(history, f, indent=2)
-    print("Chat history saved.")
\ No newline at end of file
+    # Turns were already appended as they happened; just close this session's file
+    await transcripts.end_session(cl.user_session.get("id"))
+    await transcripts.flush()  # wait until the close has actually been written
+    print("Chat history saved.")
@@ -0,0 +1,155 @@
+"""
+Latency-aware routing over several LiteLLM models.
+
+Each configured model keeps an EWMA (exponentially weighted moving average) of its
+latency and of its error rate. Every request goes to the currently fastest healthy
+model; if that call fails with a provider error (timeout, connection error, 408, 409,
+429, 5xx), the next one is tried. Client errors (400 bad request, context length
+exceeded, 401, ...) would fail on every model the same way: they are raised at once
+and do not count against the model's health.
+
+- score = EWMA latency * (1 + error_penalty * EWMA error rate)
+- models that were never measured go first, so every model gets a latency estimate
+- a model whose error rate passes `error_threshold` is cooled down for `cooldown`
+  seconds (only used as a last resort meanwhile)
+- with probability `explore` a random healthy model is tried first, so a model that
+  was slow once gets a chance to show it recovered
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from litellm import acompletion
+
+
+@dataclass
+class ModelRoute:
+    model: str  # LiteLLM model name, e.g. "gemini/gemini-2.0-flash"
+    params: dict[str, Any] = field(default_factory=dict)  # api_key, api_base, ...
+
+
+@dataclass
+class ModelHealth:
+    latency: float | None = None  # EWMA seconds, None until the first success
+    error_rate: float = 0.0  # EWMA of failures (0 = healthy, 1 = always failing)
+    cooldown_until: float = 0.0
+    calls: int = 0
+    failures: int = 0
+
+
+class AllModelsFailed(Exception):
+    """Every configured model failed for this request."""
+
+
+RETRYABLE_STATUS = {408, 409, 429}
+# LiteLLM exception classes that carry no useful status code
+_RETRYABLE_NAMES = {"Timeout", "APITimeoutError", "APIConnectionError", "ServiceUnavailableError",
+                    "InternalServerError"}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for provider-side failures another model may not have."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in _RETRYABLE_NAMES
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        routes: list[ModelRoute],
+        alpha: float = 0.3,
+        error_penalty: float = 4.0,
+        error_threshold: float = 0.5,
+        cooldown: float = 30.0,
+        explore: float = 0.05,
+        timeout: float = 30.0,
+    ):
+        if not routes:
+            raise ValueError("ModelRouter needs at least one route")
+        self.routes = routes
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.explore = explore
+        self.timeout = timeout
+        self.health = {route.model: ModelHealth() for route in routes}
+
+    def score(self, route: ModelRoute) -> float:
+        health = self.health[route.model]
+        if health.latency is None:
+            return 0.0  # unmeasured: try it
+        return health.latency * (1 + self.error_penalty * health.error_rate)
+
+    def ranked(self) -> list[ModelRoute]:
+        """Routes in the order they will be tried for the next request."""
+        now = time.monotonic()
+        healthy = [r for r in self.routes if self.health[r.model].cooldown_until <= now]
+        cooling = [r for r in self.routes if self.health[r.model].cooldown_until > now]
+        healthy.sort(key=self.score)
+        if len(healthy) > 1 and random.random() < self.explore:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        cooling.sort(key=lambda r: self.health[r.model].cooldown_until)
+        return healthy + cooling
+
+    def _ewma(self, old: float | None, sample: float) -> float:
+        return sample if old is None else self.alpha * sample + (1 - self.alpha) * old
+
+    def record_success(self, route: ModelRoute, seconds: float):
+        health = self.health[route.model]
+        health.calls += 1
+        health.latency = self._ewma(health.latency, seconds)
+        health.error_rate = self._ewma(health.error_rate, 0.0)
+
+    def record_failure(self, route: ModelRoute):
+        health = self.health[route.model]
+        health.calls += 1
+        health.failures += 1
+        health.error_rate = self._ewma(health.error_rate, 1.0)
+        if health.error_rate >= self.error_threshold:
+            health.cooldown_until = time.monotonic() + self.cooldown
+
+    async def complete(self, messages: list[dict[str, Any]], **kwargs: Any) -> tuple[Any, ModelRoute]:
+        """`litellm.acompletion` on the best model, falling back in ranked order."""
+        errors: list[str] = []
+        for route in self.ranked():
+            started = time.perf_counter()
+            try:
+                response = await acompletion(
+                    model=route.model,
+                    messages=messages,
+                    timeout=self.timeout,
+                    **{**route.params, **kwargs},
+                )
+            except Exception as e:
+                if not is_retryable(e):
+                    raise  # the request itself is wrong: every model would reject it
+                self.record_failure(route)
+                errors.append(f"{route.model}: {e}")
+                print(f"Model {route.model} failed, trying the next one: {e}")
+                continue
+            self.record_success(route, time.perf_counter() - started)
+            return response, route
+        raise AllModelsFailed("; ".join(errors))
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            model: {
+                "latency_ms": None if h.latency is None else round(h.latency * 1000),
+                "error_rate": round(h.error_rate, 3),
+                "calls": h.calls,
+                "failures": h.failures,
+                "cooling_down": h.cooldown_until > now,
+            }
+            for model, h in self.health.items()
+        }
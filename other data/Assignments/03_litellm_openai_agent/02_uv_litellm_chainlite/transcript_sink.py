@@ -0,0 +1,267 @@
+"""
+Append-only chat transcripts, one JSONL file per session.
+
+Instead of dumping the whole history into one shared chat_history.json when a chat
+ends, every turn is appended as one JSON line as it happens:
+
+- `append()` only serializes the record and puts it on a queue
+- a background writer task takes whatever is queued (up to `batch_size` records) and
+  writes it in a worker thread, so file I/O never runs on the event loop
+- fsync policy: "batch" (after every batch), "interval" (every `fsync_interval`
+  seconds while there are unsynced writes, even if no further records arrive) or
+  "never" (leave it to the OS)
+- files rotate at `max_bytes`: transcripts/<session>.0000.jsonl, .0001.jsonl, ...
+
+`read_transcript()` reads a session back (e.g. to restore history on reconnect).
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+FSYNC_POLICIES = ("batch", "interval", "never")
+
+_CLOSE = object()  # queued by end_session(): close the session's file after its records
+
+
+def _safe_name(session_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", session_id) or "session"
+
+
+def _segments(directory: Path, session_id: str) -> list[tuple[int, Path]]:
+    pattern = re.compile(re.escape(_safe_name(session_id)) + r"\.(\d+)\.jsonl$")
+    found = []
+    for path in directory.glob(f"{_safe_name(session_id)}.*.jsonl"):
+        match = pattern.match(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+@dataclass
+class _Segment:
+    file: IO[bytes]
+    index: int
+    size: int
+
+
+class TranscriptSink:
+    def __init__(
+        self,
+        directory: str | os.PathLike = "transcripts",
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        max_bytes: int = 8 * 1024 * 1024,
+        batch_size: int = 256,
+        max_pending: int = 10_000,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._open: dict[str, _Segment] = {}
+        self._unsynced: set[str] = set()
+        self._last_fsync = time.monotonic()
+
+        self.records = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.rotations = 0
+
+    # ----- event-loop side -----
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            self._queue = asyncio.Queue(self.max_pending)  # full queue = backpressure on append()
+            self._writer = asyncio.create_task(self._run())
+
+    async def append(self, session_id: str, record: dict[str, Any]):
+        """Queue one record for the session's transcript (adds a `ts` timestamp)."""
+        self._ensure_writer()
+        line = json.dumps({"ts": time.time(), **record}, ensure_ascii=False) + "\n"
+        await self._queue.put((session_id, line))
+
+    async def end_session(self, session_id: str):
+        """Close the session's file once its queued records are written."""
+        self._ensure_writer()
+        await self._queue.put((session_id, _CLOSE))
+
+    async def flush(self):
+        """Wait until everything queued so far is written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        await asyncio.to_thread(self._close_all)
+
+    def _fsync_timeout(self) -> float | None:
+        """Seconds until unsynced writes are due for an fsync (None: nothing to wait for)."""
+        if self.fsync != "interval" or not self._unsynced:
+            return None
+        return max(0.0, self._last_fsync + self.fsync_interval - time.monotonic())
+
+    async def _run(self):
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self._fsync_timeout())
+            except asyncio.TimeoutError:
+                # Quiet period: sync what the last batches left behind instead of
+                # waiting for the next record to arrive
+                try:
+                    await asyncio.to_thread(self._sync_unsynced)
+                except Exception as e:
+                    print(f"Transcript fsync failed: {e}")
+                    self._unsynced.clear()  # don't spin on a broken file
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:  # a full disk must not take the chat down
+                print(f"Transcript write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    # ----- writer thread side (only ever one batch at a time) -----
+
+    def _segment(self, session_id: str) -> _Segment:
+        segment = self._open.get(session_id)
+        if segment is None:
+            existing = _segments(self.directory, session_id)
+            index = existing[-1][0] if existing else 0
+            segment = self._open_segment(session_id, index)
+            self._open[session_id] = segment
+        return segment
+
+    def _open_segment(self, session_id: str, index: int) -> _Segment:
+        path = self.directory / f"{_safe_name(session_id)}.{index:04d}.jsonl"
+        file = open(path, "ab")
+        return _Segment(file, index, file.tell())
+
+    def _sync(self, segment: _Segment):
+        segment.file.flush()
+        if self.fsync != "never":
+            os.fsync(segment.file.fileno())
+            self.fsyncs += 1
+
+    def _write(self, session_id: str, lines: list[str]):
+        data = "".join(lines).encode("utf-8")
+        segment = self._segment(session_id)
+        if segment.size and segment.size + len(data) > self.max_bytes:
+            self._sync(segment)
+            segment.file.close()
+            segment = self._open_segment(session_id, segment.index + 1)
+            self._open[session_id] = segment
+            self.rotations += 1
+        segment.file.write(data)
+        segment.size += len(data)
+        self.records += len(lines)
+        self._unsynced.add(session_id)
+
+    def _close_session(self, session_id: str):
+        segment = self._open.pop(session_id, None)
+        if segment is not None:
+            self._sync(segment)
+            segment.file.close()
+        self._unsynced.discard(session_id)
+
+    def _write_batch(self, batch: list[tuple[str, Any]]):
+        pending: dict[str, list[str]] = {}
+        for session_id, item in batch:
+            if item is _CLOSE:
+                if session_id in pending:
+                    self._write(session_id, pending.pop(session_id))
+                self._close_session(session_id)
+            else:
+                pending.setdefault(session_id, []).append(item)
+        for session_id, lines in pending.items():
+            self._write(session_id, lines)
+        self.batches += 1
+
+        if self.fsync == "batch" or (
+            self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval
+        ):
+            self._sync_unsynced()
+        else:
+            for session_id in self._unsynced:
+                self._open[session_id].file.flush()  # visible to readers, durable on next fsync
+
+    def _sync_unsynced(self):
+        for session_id in self._unsynced:
+            self._sync(self._open[session_id])
+        self._unsynced.clear()
+        self._last_fsync = time.monotonic()
+
+    def _close_all(self):
+        for session_id in list(self._open):
+            self._close_session(session_id)
+
+
+def read_transcript(directory: str | os.PathLike, session_id: str) -> Iterator[dict[str, Any]]:
+    """All records of a session in order, across rotated files."""
+    for _, path in _segments(Path(directory), session_id):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line after a crash
+
+
+# 🧪 Many sessions writing at once: python transcript_sink.py
+if __name__ == "__main__":
+    import tempfile
+
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            sink = TranscriptSink(tmp, fsync="batch", max_bytes=4096)
+
+            async def session(n: int):
+                for turn in range(50):
+                    await sink.append(f"session-{n}", {"role": "user", "content": f"question {turn}"})
+                    await sink.append(f"session-{n}", {"role": "assistant", "content": f"answer {turn} " * 5})
+                    await asyncio.sleep(0)
+                await sink.end_session(f"session-{n}")
+
+            started = time.perf_counter()
+            await asyncio.gather(*(session(n) for n in range(100)))
+            await sink.close()
+            elapsed = time.perf_counter() - started
+
+            records = list(read_transcript(tmp, "session-7"))
+            assert len(records) == 100 and records[-1]["content"].startswith("answer 49"), len(records)
+            print(f"{sink.records} records in {sink.batches} batches, {sink.fsyncs} fsyncs, "
+                  f"{sink.rotations} rotations, {elapsed:.2f}s")
+
+            # "interval": a lone record is fsynced by the timer, not by the next batch
+            sink = TranscriptSink(tmp, fsync="interval", fsync_interval=0.1)
+            await sink.append("quiet", {"role": "user", "content": "anyone there?"})
+            await sink.flush()
+            await asyncio.sleep(0.3)
+            assert sink.fsyncs == 1 and not sink._unsynced, sink.fsyncs
+            await sink.close()
+            print("interval fsync without further writes: ok")
+
+    asyncio.run(main())
@@ -0,0 +1,271 @@
+"""
+Admission control for model calls.
+
+When the provider returns 429/5xx, every session retrying on its own turns a short
+overload into a storm. An AdmissionController (one per provider) sits in front of
+every model call instead:
+
+- at most `max_in_flight` calls run at once; the rest wait in a FIFO queue
+- the queue is bounded (`max_queue`) and every wait has a deadline (`queue_timeout`);
+  past either limit the call is rejected with AdmissionRejected right away
+- 429/408/409/5xx and connection errors are retried with jittered exponential backoff
+- `Retry-After` is honored and pauses the whole provider, not just the one call,
+  so queued calls back off together instead of hitting the limit again
+- metrics: admitted, queued, rejected, retried, failed, peak queue depth, queue wait
+
+AdmittedModel wraps any agents SDK Model, so the Runner goes through the controller
+for both `get_response` and `stream_response`.
+"""
+
+import asyncio
+import email.utils
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+import openai
+from agents.models.interface import Model
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class AdmissionRejected(Exception):
+    """The provider is saturated: the wait queue is full or the queue deadline passed."""
+
+
+@dataclass
+class AdmissionLimits:
+    max_in_flight: int = 8
+    max_queue: int = 64
+    queue_timeout: float = 20.0  # seconds a call may wait for a slot
+    max_retries: int = 4
+    base_delay: float = 0.5  # first backoff, doubled per attempt
+    max_delay: float = 20.0  # cap for backoff and Retry-After
+
+
+@dataclass
+class AdmissionMetrics:
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    retried: int = 0
+    failed: int = 0
+    peak_queue: int = 0
+    queue_wait_ms: float = 0.0  # total, divide by `queued` for the average
+
+    def as_dict(self) -> dict[str, float]:
+        return dict(self.__dict__)
+
+
+# =============================================================================
+# Error classification
+# =============================================================================
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds from the `retry-after-ms` / `Retry-After` header (delta or HTTP date), if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if (ms := headers.get("retry-after-ms")) is not None:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# =============================================================================
+# Controller
+# =============================================================================
+
+
+class AdmissionController:
+    def __init__(self, name: str, limits: AdmissionLimits | None = None):
+        self.name = name
+        self.limits = limits or AdmissionLimits()
+        self.metrics = AdmissionMetrics()
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._paused_until = 0.0  # set by Retry-After, shared by every call
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def _acquire(self):
+        if self.in_flight < self.limits.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.metrics.admitted += 1
+            return
+
+        if len(self._waiters) >= self.limits.max_queue:
+            self.metrics.rejected += 1
+            raise AdmissionRejected(f"{self.name}: {len(self._waiters)} calls already waiting")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.metrics.queued += 1
+        self.metrics.peak_queue = max(self.metrics.peak_queue, len(self._waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.limits.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # the slot was handed over just as we gave up: pass it on
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.metrics.rejected += 1
+            raise AdmissionRejected(f"{self.name}: no slot within {self.limits.queue_timeout:g}s") from None
+        finally:
+            self.metrics.queue_wait_ms += (time.perf_counter() - started) * 1000
+        self.metrics.admitted += 1
+
+    def _release(self):
+        # Hand the slot straight to the oldest waiter, so late arrivals cannot jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one in-flight slot; waits out any provider-wide pause first."""
+        await self._acquire()
+        try:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            yield
+        finally:
+            self._release()
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        """Delay before retry `attempt` (0-based): Retry-After if given, else full-jitter backoff."""
+        hinted = retry_after(exc)
+        if hinted is not None:
+            delay = min(hinted, self.limits.max_delay)
+            # The provider told everyone to wait: pause new calls too
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            return delay
+        return random.uniform(0, min(self.limits.max_delay, self.limits.base_delay * 2**attempt))
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` inside a slot, retrying retryable errors (the slot is released while sleeping)."""
+        attempt = 0
+        while True:
+            async with self.slot():
+                try:
+                    return await fn()
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= self.limits.max_retries:
+                        self.metrics.failed += 1
+                        raise
+                    delay = self.backoff(attempt, e)
+            self.metrics.retried += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+# =============================================================================
+# Agents SDK integration
+# =============================================================================
+
+
+class AdmittedModel(Model):
+    """A Model whose calls go through an AdmissionController."""
+
+    def __init__(self, model: Model, controller: AdmissionController):
+        self.model = model
+        self.controller = controller
+
+    async def get_response(self, *args: Any, **kwargs: Any):
+        return await self.controller.call(lambda: self.model.get_response(*args, **kwargs))
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        # A stream can only be retried before its first event: after that the user has
+        # already seen part of the answer, so later errors are raised as they are.
+        attempt = 0
+        while True:
+            started = False
+            async with self.controller.slot():
+                try:
+                    async for event in self.model.stream_response(*args, **kwargs):
+                        started = True
+                        yield event
+                    return
+                except Exception as e:
+                    if started or not is_retryable(e) or attempt >= self.controller.limits.max_retries:
+                        self.controller.metrics.failed += 1
+                        raise
+                    delay = self.controller.backoff(attempt, e)
+            self.controller.metrics.retried += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+# 🧪 Burst against a flaky provider: python admission.py
+if __name__ == "__main__":
+
+    class FakeResponse:
+        def __init__(self, headers: dict[str, str]):
+            self.headers = headers
+
+    class FakeRateLimit(Exception):
+        status_code = 429
+
+        def __init__(self):
+            super().__init__("429 Too Many Requests")
+            self.response = FakeResponse({"retry-after": "0.2"})
+
+    async def main():
+        controller = AdmissionController(
+            "gemini", AdmissionLimits(max_in_flight=4, max_queue=40, queue_timeout=5, base_delay=0.05)
+        )
+        calls = 0
+
+        async def flaky() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            if calls % 10 == 0:  # every 10th call hits the rate limit
+                raise FakeRateLimit()
+            return "ok"
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(controller.call(flaky) for _ in range(60)), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+        ok = sum(r == "ok" for r in results)
+        rejected = sum(isinstance(r, AdmissionRejected) for r in results)
+        print(f"60 calls in {elapsed:.2f}s: {ok} ok, {rejected} rejected, {controller.in_flight} still in flight")
+        print(controller.metrics.as_dict())
+
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+One chat turn, independent of Chainlit.
+
+`stream_turn()` runs the agent with `Runner.run_streamed`, pushes text deltas into a
+TokenCoalescer and returns the final answer, the updated history and stream stats.
+
+`respond()` is the whole on_message path (semantic cache for opening messages →
+history window → run → background compaction).
+main.py wires it to `cl.Message.stream_token`; loadgen.py drives it with a fake sink.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from agents import Agent, Runner
+from agents.run import RunConfig
+from openai.types.responses import ResponseTextDeltaEvent
+
+from history_compaction import BackgroundCompaction
+from semantic_cache import SemanticCache
+from session_runs import SessionRuns
+from token_stream import StreamStats, TokenCoalescer
+
+
+@dataclass
+class TurnResult:
+    final_output: str
+    history: list[Any]  # result.to_input_list(), the input for the next turn
+    stats: StreamStats
+    cached: bool = False
+
+
+async def stream_turn(
+    agent: Agent,
+    history: list[Any],
+    config: RunConfig,
+    on_text: Callable[[str], Awaitable[None]],
+    stats: StreamStats | None = None,
+) -> TurnResult:
+    coalescer = TokenCoalescer(on_text, stats=stats)
+    result = Runner.run_streamed(starting_agent=agent, input=history, run_config=config)
+    try:
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                await coalescer.push(event.data.delta)
+    except BaseException:
+        result.cancel()  # stop the SDK's background run too (cancellation, errors)
+        raise
+    stats = await coalescer.close()
+    return TurnResult(str(result.final_output), result.to_input_list(), stats)
+
+
+async def respond(
+    session_id: str,
+    compaction: BackgroundCompaction,
+    text: str,
+    agent: Agent,
+    config: RunConfig,
+    runs: SessionRuns,
+    on_text: Callable[[str], Awaitable[None]],
+    stats: StreamStats | None = None,
+    cache: SemanticCache | None = None,
+) -> TurnResult:
+    """Answer one user message in a session and schedule history compaction."""
+    # Summary + recent window (waits only if last turn's compaction is still running)
+    state = await compaction.latest()
+    history = state.as_input()
+    # The cache is shared by every session and keyed on the question alone, so only an
+    # opening message may use it: a follow-up ("can you summarize our chat?") depends on
+    # this conversation, and another user's answer would be wrong and leak their chat
+    use_cache = cache is not None and not history
+    history.append({"role": "user", "content": text})
+
+    hit = cache.lookup(text) if use_cache else None
+    if hit is not None:
+        # Near-duplicate of an earlier question: serve the stored answer, no model call
+        stats = stats or StreamStats()
+        stats.first_token_at = time.perf_counter()
+        stats.deltas = stats.frames = 1
+        stats.chars = len(hit.answer)
+        await on_text(hit.answer)
+        stats.finished_at = time.perf_counter()
+        history.append({"role": "assistant", "content": hit.answer})
+        turn = TurnResult(hit.answer, history, stats, cached=True)
+    else:
+        # One in-flight run per session; async, so other sessions keep progressing
+        turn = await runs.run(session_id, stream_turn(agent, history, config, on_text, stats))
+        if use_cache:
+            cache.store(text, turn.final_output)
+
+    # Update chat history and compact it in the background before the next turn
+    compaction.schedule(state.after_turn(turn.history))
+    return turn
+
+
+# 🧪 The cache never crosses conversations: python chat_turn.py
+if __name__ == "__main__":
+    import asyncio
+
+    from agents import AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled
+
+    from history_compaction import HistoryCompactor
+    from loadgen import FakeChatBackend
+
+    async def main():
+        set_tracing_disabled(True)
+        backend = await FakeChatBackend(first_token_delay=0.01, tokens=5, token_delay=0).start()
+        client = AsyncOpenAI(api_key="fake-key", base_url=f"http://127.0.0.1:{backend.port}/v1", max_retries=0)
+        model = OpenAIChatCompletionsModel(model="fake", openai_client=client)
+        config = RunConfig(model=model, tracing_disabled=True)
+        agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
+        cache, runs, compactor = SemanticCache(), SessionRuns(), HistoryCompactor(budget_tokens=3000)
+
+        async def discard(_text: str):
+            pass
+
+        async def ask(session_id: str, compaction: BackgroundCompaction, text: str) -> TurnResult:
+            return await respond(session_id, compaction, text, agent, config, runs, discard, cache=cache)
+
+        alice, bob = BackgroundCompaction(compactor), BackgroundCompaction(compactor)
+        assert not (await ask("alice", alice, "What is an AI agent, exactly?")).cached
+        assert (await ask("bob", bob, "what is an ai agent exactly")).cached  # standalone: shared
+        followup = "Thanks, can you summarize our chat?"
+        assert not (await ask("alice", alice, followup)).cached
+        assert not (await ask("bob", bob, followup)).cached  # Bob must not get Alice's summary
+        print(f"opening question shared, follow-ups per conversation: ok {cache.stats()}")
+
+        await client.close()
+        await backend.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,198 @@
+"""
+Token-budgeted history compaction.
+
+Sending the whole `chat_history` every turn makes each turn slower and pricier than
+the last. Instead the session keeps:
+- `recent`:  the newest items, up to a token budget, sent verbatim
+- `summary`: a rolling summary of everything older, sent as one system message
+
+Compaction runs in the background right after a turn finishes, so it overlaps with the
+user reading/typing; the next turn only waits for it if it is still running.
+
+Summaries are extractive by default (no model call). `model_summarizer()` uses a cheap
+model instead.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+Item = dict[str, Any]
+Summarizer = Callable[[str | None, list[Item]], Awaitable[str]]
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def item_text(item: Item) -> str:
+    """Plain text of an input item (messages, tool calls and tool outputs)."""
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    if item.get("type") == "function_call":
+        return f"{item.get('name', '')}({item.get('arguments', '')})"
+    if item.get("type") == "function_call_output":
+        return str(item.get("output", ""))
+    return ""
+
+
+def estimate_tokens(item: Item) -> int:
+    # ~4 characters per token plus a few tokens of per-message overhead
+    return len(item_text(item)) // 4 + 4
+
+
+# =============================================================================
+# Summarizers
+# =============================================================================
+
+
+def _first_sentence(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    for end in (". ", "? ", "! ", "\n"):
+        cut = text.find(end)
+        if 0 < cut < limit:
+            return text[: cut + 1]
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+async def extractive_summary(previous: str | None, items: list[Item], max_chars: int = 1500) -> str:
+    """User questions plus the first sentence of each answer, newest kept when over budget."""
+    lines = previous.splitlines() if previous else []
+    for item in items:
+        role = item.get("role")
+        text = item_text(item)
+        if not text or role not in ("user", "assistant"):
+            continue
+        lines.append(f"- {role.capitalize()}: {_first_sentence(text, 160)}")
+
+    kept: list[str] = []
+    size = 0
+    for line in reversed(lines):
+        if size + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    return "\n".join(reversed(kept))
+
+
+def model_summarizer(agent: Any, run_config: Any = None) -> Summarizer:
+    """Summarize with a (cheap) agent, e.g. Agent(name="Summarizer", model=<flash-lite model>)."""
+    from agents import Runner
+
+    async def summarize(previous: str | None, items: list[Item]) -> str:
+        transcript = "\n".join(f"{item.get('role', item.get('type'))}: {item_text(item)}" for item in items)
+        prompt = (
+            "Update the running summary of a chat. Keep names, numbers, decisions and open questions. "
+            "Be brief.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"
+        )
+        result = await Runner.run(agent, prompt, run_config=run_config)
+        return str(result.final_output)
+
+    return summarize
+
+
+# =============================================================================
+# Compaction
+# =============================================================================
+
+
+@dataclass
+class CompactedHistory:
+    summary: str | None = None
+    recent: list[Item] = field(default_factory=list)
+
+    def as_input(self) -> list[Item]:
+        """Items to send to the model: summary (if any) + recent window."""
+        head = [{"role": "system", "content": SUMMARY_PREFIX + self.summary}] if self.summary else []
+        return head + self.recent
+
+    def after_turn(self, turn_history: list[Item]) -> "CompactedHistory":
+        """New state from `result.to_input_list()` of a run started with `as_input()`."""
+        return CompactedHistory(self.summary, turn_history[1 if self.summary else 0:])
+
+
+class HistoryCompactor:
+    def __init__(
+        self,
+        budget_tokens: int = 3000,
+        summarizer: Summarizer = extractive_summary,
+    ):
+        self.budget_tokens = budget_tokens
+        self.summarizer = summarizer
+
+    def split(self, items: list[Item]) -> tuple[list[Item], list[Item]]:
+        """(older items to fold into the summary, recent items within the budget)."""
+        used = 0
+        start = len(items)
+        while start > 0 and used + estimate_tokens(items[start - 1]) <= self.budget_tokens:
+            start -= 1
+            used += estimate_tokens(items[start])
+
+        # Start the window at a user message so tool calls/outputs are never split apart
+        while start < len(items) and items[start].get("role") != "user":
+            start += 1
+        if start == len(items):
+            # Even the last exchange is over budget: keep it from its last user message
+            start = max((i for i, item in enumerate(items) if item.get("role") == "user"), default=0)
+        return items[:start], items[start:]
+
+    async def compact(self, state: CompactedHistory) -> CompactedHistory:
+        older, recent = self.split(state.recent)
+        if not older:
+            return state
+        summary = await self.summarizer(state.summary, older)
+        return CompactedHistory(summary, recent)
+
+
+class BackgroundCompaction:
+    """
+    Runs compaction between turns; `latest()` returns the freshest state.
+
+    `loader` fetches the initial state lazily (e.g. ChatSession.load) and `on_state`
+    is told about every new state (e.g. ChatSession.update to persist it).
+    """
+
+    def __init__(
+        self,
+        compactor: HistoryCompactor,
+        loader: Callable[[], Awaitable[CompactedHistory]] | None = None,
+        on_state: Callable[[CompactedHistory], None] | None = None,
+    ):
+        self.compactor = compactor
+        self.loader = loader
+        self.on_state = on_state
+        self.state: CompactedHistory | None = None
+        self._task: asyncio.Task | None = None
+
+    def _publish(self, state: CompactedHistory):
+        self.state = state
+        if self.on_state is not None:
+            self.on_state(state)
+
+    def schedule(self, state: CompactedHistory):
+        self._publish(state)
+        self._task = asyncio.create_task(self._compact(state))
+
+    async def _compact(self, state: CompactedHistory) -> CompactedHistory:
+        compacted = await self.compactor.compact(state)
+        if compacted is not state:
+            self._publish(compacted)
+        return compacted
+
+    async def latest(self) -> CompactedHistory:
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:  # a failed summary must never break the chat
+                print(f"History compaction failed: {e}")
+            self._task = None
+        if self.state is None:
+            self.state = await self.loader() if self.loader is not None else CompactedHistory()
+        return self.state
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,272 @@
+"""
+Load generator for the chat app.
+
+Simulates N concurrent chat sessions, each sending a scripted multi-turn conversation
+through the same path as `@cl.on_message` (chat_turn.respond: history window →
+streamed agent run → background compaction), with the model wrapped in the same
+AdmissionController limits as main.py (GEMINI_MAX_IN_FLIGHT / GEMINI_MAX_QUEUE,
+default 8 / 64), against a local fake OpenAI-compatible backend, and reports:
+
+- throughput (turns/sec)
+- end-to-end turn latency p50/p95/p99
+- time-to-first-token p50/p95/p99
+- event-loop lag p50/p99/max (how late a 10 ms timer fires; high = something blocks the loop)
+- admission metrics (queued, rejected, peak queue, queue wait)
+
+    python loadgen.py --sessions 200 --turns 5
+    python loadgen.py --sessions 50 --base-url http://localhost:8000/v1   # another backend
+    python loadgen.py --no-admission   # raw backend capacity, no in-flight limit
+    python loadgen.py --cache --ramp-up 10   # staggered sessions: later ones get the
+                                             # opening question from the cache
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled
+from agents.run import RunConfig
+
+from admission import AdmissionController, AdmissionLimits, AdmissionRejected, AdmittedModel
+from chat_turn import respond
+from history_compaction import BackgroundCompaction, HistoryCompactor
+from semantic_cache import SemanticCache
+from session_runs import SessionRuns
+from token_stream import StreamStats
+
+SCRIPT = [
+    "Hi! What can you help me with?",
+    "Explain what an AI agent is in two sentences.",
+    "How do tools fit into that?",
+    "Give me an example of a handoff between agents.",
+    "Thanks, can you summarize our chat?",
+]
+
+
+# =============================================================================
+# Fake OpenAI-compatible backend (chat completions, streaming + non-streaming)
+# =============================================================================
+
+
+class FakeChatBackend:
+    def __init__(self, first_token_delay: float = 0.2, tokens: int = 40, token_delay: float = 0.01):
+        self.first_token_delay = first_token_delay
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.requests = 0
+        self.port = 0
+        self._server: asyncio.base_events.Server | None = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeChatBackend":
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """Stop listening, close idle keep-alive connections and wait for the handlers."""
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:  # keep-alive: several requests per connection
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                request = json.loads(body or b"{}")
+                self.requests += 1
+                if request.get("stream"):
+                    await self._stream(writer, request)
+                else:
+                    await self._complete(writer, request)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _words(self) -> list[str]:
+        return [f"token{i} " for i in range(self.tokens)]
+
+    async def _complete(self, writer: asyncio.StreamWriter, request: dict):
+        await asyncio.sleep(self.first_token_delay + self.tokens * self.token_delay)
+        payload = json.dumps({
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "".join(self._words())}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": self.tokens, "total_tokens": 10 + self.tokens},
+        }).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+            % (len(payload), payload)
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, request: dict):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        await asyncio.sleep(self.first_token_delay)
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> dict:
+            return {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": word}) for word in self._words()]
+        events.append(chunk({}, "stop"))
+        for i, event in enumerate(events):
+            data = b"data: " + json.dumps(event).encode() + b"\n\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await writer.drain()
+            if 1 < i < len(events) - 1:
+                await asyncio.sleep(self.token_delay)
+        done = b"data: [DONE]\n\n"
+        writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(done), done))
+        await writer.drain()
+
+
+# =============================================================================
+# Load generation
+# =============================================================================
+
+
+@dataclass
+class Results:
+    latencies_ms: list[float] = field(default_factory=list)
+    ttfts_ms: list[float] = field(default_factory=list)
+    loop_lag_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    rejected: int = 0  # turns refused by admission control ("busy" in the app)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))  # nearest-rank
+    return ordered[rank]
+
+
+async def monitor_loop_lag(results: Results, interval: float = 0.01):
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        results.loop_lag_ms.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+async def run_session(
+    session: int, turns: int, think_time: float, agent: Agent, config: RunConfig,
+    runs: SessionRuns, compactor: HistoryCompactor, results: Results, cache: SemanticCache | None,
+    start_delay: float = 0.0,
+):
+    await asyncio.sleep(start_delay)
+    compaction = BackgroundCompaction(compactor)
+
+    async def discard(_text: str):
+        pass  # the websocket frame would be sent here
+
+    for turn in range(turns):
+        stats = StreamStats()
+        try:
+            await respond(f"session-{session}", compaction, SCRIPT[turn % len(SCRIPT)],
+                          agent, config, runs, on_text=discard, stats=stats, cache=cache)
+        except AdmissionRejected:
+            results.rejected += 1
+            continue
+        except Exception as e:
+            results.errors += 1
+            print(f"session {session} turn {turn}: {e!r}")
+            continue
+        results.latencies_ms.append(stats.total_ms)
+        if stats.ttft_ms is not None:
+            results.ttfts_ms.append(stats.ttft_ms)
+        await asyncio.sleep(think_time)
+
+
+async def main(args: argparse.Namespace):
+    set_tracing_disabled(True)
+
+    backend = None
+    base_url = args.base_url
+    if base_url is None:
+        backend = await FakeChatBackend(args.first_token_delay, args.tokens, args.token_delay).start()
+        base_url = f"http://127.0.0.1:{backend.port}/v1"
+
+    client = AsyncOpenAI(api_key=args.api_key, base_url=base_url, max_retries=0)
+    model = OpenAIChatCompletionsModel(model=args.model, openai_client=client)
+    admission = None
+    if not args.no_admission:
+        # Same wrapper and limits as main.py, so the numbers include its queueing
+        admission = AdmissionController("loadgen", AdmissionLimits(max_in_flight=args.max_in_flight,
+                                                                   max_queue=args.max_queue))
+        model = AdmittedModel(model, admission)
+    config = RunConfig(model=model, model_provider=client, tracing_disabled=True)
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
+
+    results = Results()
+    runs = SessionRuns()
+    compactor = HistoryCompactor(budget_tokens=3000)
+    cache = SemanticCache() if args.cache else None
+    lag_task = asyncio.create_task(monitor_loop_lag(results))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(i, args.turns, args.think_time, agent, config, runs, compactor, results, cache,
+                    start_delay=args.ramp_up * i / args.sessions)
+        for i in range(args.sessions)
+    ))
+    elapsed = time.perf_counter() - started
+    lag_task.cancel()
+    await client.close()
+    if backend is not None:
+        await backend.stop()
+
+    done = len(results.latencies_ms)
+    print(f"\n{args.sessions} sessions x {args.turns} turns against {base_url}")
+    print(f"  completed turns : {done} ({results.errors} errors, {results.rejected} rejected) in {elapsed:.2f}s")
+    print(f"  throughput      : {done / elapsed:.1f} turns/s")
+    for label, values in (("end-to-end ms", results.latencies_ms), ("TTFT ms", results.ttfts_ms)):
+        print(f"  {label:<16}: p50 {percentile(values, 50):8.1f}  p95 {percentile(values, 95):8.1f}  "
+              f"p99 {percentile(values, 99):8.1f}")
+    lag = results.loop_lag_ms
+    print(f"  loop lag ms     : p50 {percentile(lag, 50):8.1f}  p99 {percentile(lag, 99):8.1f}  "
+          f"max {max(lag, default=0):8.1f}")
+    if admission is not None:
+        print(f"  admission       : {admission.metrics.as_dict()}")
+    if cache is not None:
+        print(f"  semantic cache  : {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent chat-session load generator")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=len(SCRIPT))
+    parser.add_argument("--think-time", type=float, default=0.5, help="seconds between turns")
+    parser.add_argument("--first-token-delay", type=float, default=0.2, help="fake backend only")
+    parser.add_argument("--tokens", type=int, default=40, help="fake backend only")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="fake backend only")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint (default: built-in fake)")
+    parser.add_argument("--api-key", default="fake-key")
+    parser.add_argument("--model", default="gemini-2.0-flash")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which session starts are spread")
+    parser.add_argument("--max-in-flight", type=int, default=int(os.getenv("GEMINI_MAX_IN_FLIGHT", "8")))
+    parser.add_argument("--max-queue", type=int, default=int(os.getenv("GEMINI_MAX_QUEUE", "64")))
+    parser.add_argument("--no-admission", action="store_true", help="call the backend without admission control")
+    parser.add_argument("--cache", action="store_true",
+                        help="serve repeated opening questions from a SemanticCache (combine with --ramp-up)")
+    asyncio.run(main(parser.parse_args()))
@@ -2,8 +2,15 @@ import os
 from dotenv import load_dotenv
 from typing import cast
 import chainlit as cl
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
 from agents.run import RunConfig
+from admission import AdmissionController, AdmissionLimits, AdmissionRejected, AdmittedModel
+from chat_turn import respond
+from history_compaction import BackgroundCompaction, HistoryCompactor
+from semantic_cache import SemanticCache
+from session_runs import RunSuperseded, SessionRuns
+from session_store import ChatSession, open_store
+from token_stream import StreamStats
 
 # Load .env environment variables
 load_dotenv()
@@ -13,83 +20,135 @@ gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
 
+# Stateless pieces are shared by all sessions, so any worker can serve any session
+# Retries are done by the admission controller below, not by the client
+external_client = AsyncOpenAI(
+    api_key=gemini_api_key,
+    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+    max_retries=0,
+)
+
+# Per-provider admission control: bounded in-flight calls, a bounded wait queue,
+# Retry-After and jittered backoff shared by all sessions
+gemini_admission = AdmissionController(
+    "gemini",
+    AdmissionLimits(
+        max_in_flight=int(os.getenv("GEMINI_MAX_IN_FLIGHT", "8")),
+        max_queue=int(os.getenv("GEMINI_MAX_QUEUE", "64")),
+    ),
+)
+
+# Define the chat model
+model = AdmittedModel(
+    OpenAIChatCompletionsModel(
+        model="gemini-2.0-flash",
+        openai_client=external_client
+    ),
+    gemini_admission,
+)
+
+# Configure the run environment
+config = RunConfig(
+    model=model,
+    model_provider=external_client,
+    tracing_disabled=True
+)
+
+agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
+
+# One in-flight agent run per chat session (new message / stop / disconnect cancels it)
+runs = SessionRuns()
+
+# Recent turns up to ~3000 tokens are sent verbatim; older ones are folded into a summary
+compactor = HistoryCompactor(budget_tokens=3000)
+
+# Answers to near-duplicate questions are served from memory instead of the model
+cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+)
+
+# Session state lives outside the worker (memory://, sqlite:///sessions.db, redis://host:6379/0)
+store = open_store(os.getenv("SESSION_STORE_URL", "sqlite:///sessions.db"))
+
 @cl.on_chat_start
 async def start():
     """Set up the chat session when a user connects."""
-    
-    # Initialize external OpenAI-compatible client
-    external_client = AsyncOpenAI(
-        api_key=gemini_api_key,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    )
-
-    # Define the chat model
-    model = OpenAIChatCompletionsModel(
-        model="gemini-2.0-flash",
-        openai_client=external_client
-    )
-
-    # Configure the run environment
-    config = RunConfig(
-        model=model,
-        model_provider=external_client,
-        tracing_disabled=True
-    )
-
-    # Store necessary objects in session
-    cl.user_session.set("chat_history", [])
-    cl.user_session.set("config", config)
-    
-    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model)
-    cl.user_session.set("agent", agent)
+
+    # Keyed by thread id, so the history is found again after a restart or on another worker.
+    # Nothing is read from the store yet: history is loaded on the first message.
+    chat = ChatSession(store, cl.context.session.thread_id)
+    cl.user_session.set("chat", chat)
+    cl.user_session.set("history", BackgroundCompaction(compactor, loader=chat.load, on_state=chat.update))
 
     await cl.Message(content="Welcome to Samad Chatbot!").send()
 
 @cl.on_message
 async def main(message: cl.Message):
-    """Handle user message and generate response from agent."""
-    
-    # Initial response while thinking
-    msg = cl.Message(content="Thinking...")
-    await msg.send()
+    """Handle user message and stream the agent's answer token by token."""
+    stats = StreamStats()  # clock starts when the message arrives
 
-    # Retrieve session objects
-    agent: Agent = cast(Agent, cl.user_session.get("agent"))
-    config: RunConfig = cast(RunConfig, cl.user_session.get("config"))
-    history = cl.user_session.get("chat_history") or []
+    # Empty message that fills up as tokens arrive
+    msg = cl.Message(content="")
 
-    # Append current user input to history
-    history.append({"role": "user", "content": message.content})
+    # Retrieve session objects
+    compaction: BackgroundCompaction = cast(BackgroundCompaction, cl.user_session.get("history"))
 
     try:
-        print("\n[CALLING_AGENT_WITH_CONTEXT]\n", history, "\n")
-
-        # Run the agent with chat history
-        result = Runner.run_sync(
-            starting_agent=agent,
-            input=history,
-            run_config=config
+        # Stream the agent's answer (async: never blocks other users' sessions)
+        turn = await respond(
+            cl.user_session.get("id"),
+            compaction,
+            message.content,
+            agent,
+            config,
+            runs,
+            on_text=msg.stream_token,
+            stats=stats,
+            cache=cache,
         )
+        await msg.send()  # finalize the streamed message
 
-        # Get agent's final response
-        response_content = result.final_output
-
-        # Update placeholder message
-        msg.content = response_content
-        await msg.update()
-
-        # Update chat history in session
-        cl.user_session.set("chat_history", result.to_input_list())
+        # Latency metrics: time-to-first-token is what users notice
+        ttfts = cl.user_session.get("ttft_ms") or []
+        ttfts.append(turn.stats.ttft_ms)
+        cl.user_session.set("ttft_ms", ttfts)
 
         # Optional logging
         print(f"User: {message.content}")
-        print(f"Assistant: {response_content}")
+        print(f"Assistant: {turn.final_output}")
+        print(f"TTFT: {turn.stats.ttft_ms or 0:.0f} ms, total: {turn.stats.total_ms:.0f} ms, "
+              f"{turn.stats.deltas} deltas in {turn.stats.frames} frames"
+              + (f" (cached, {cache.stats()['hit_rate']:.0%} hit rate)" if turn.cached else ""))
+
+    except RunSuperseded:
+        # A newer message took over and gets the answer instead
+        msg.content += "\n\n(Skipped: a newer message arrived)"
+        await msg.send()
+
+    except AdmissionRejected as e:
+        # Provider saturated: tell the user instead of piling on more retries
+        msg.content = "The assistant is busy right now, please try again in a moment."
+        await msg.send()
+        print(f"Rejected: {e} {gemini_admission.metrics.as_dict()}")
 
     except Exception as e:
         msg.content = f"Error: {str(e)}"
-        await msg.update()
+        await msg.send()
         print(f"Error: {str(e)}")
 
+@cl.on_stop
+async def stop():
+    """User pressed stop: cancel only this session's run."""
+    runs.cancel(cl.user_session.get("id"))
+
+@cl.on_chat_end
+async def end():
+    """User disconnected: don't keep paying for an answer nobody will read."""
+    runs.cancel(cl.user_session.get("id"))
+    cast(BackgroundCompaction, cl.user_session.get("history")).cancel()
+    await cast(ChatSession, cl.user_session.get("chat")).close()  # flush pending writes now
+
 
 
 
@@ -0,0 +1,215 @@
+"""
+Semantic response cache.
+
+Many chat messages are near-duplicates of earlier ones ("What is an AI agent?",
+"what is an ai agent"). Instead of paying a full model call for each, the last user
+turn is embedded and compared against earlier questions:
+
+- vectors live in one preallocated float32 NumPy matrix; a lookup is one
+  matrix-vector product (cosine similarity, rows are L2-normalized)
+- a hit needs similarity >= `threshold`; the stored answer is served in milliseconds
+- entries expire after `ttl` seconds and can be invalidated one by one
+  (by id or by a text close to the cached question)
+- when full, expired slots are reused first, then the oldest entry is evicted
+
+The default embedder is a local hashing embedder (no API calls). It matches
+rewordings in case, punctuation and word order; it cannot tell "install" from
+"uninstall" well, hence the strict default threshold. Pass a real embedding model
+(anything with `dim` and `embed()`) to also catch paraphrases.
+
+Entries are keyed on the question text alone and shared by all sessions, so only
+standalone questions belong here: chat_turn.respond() uses the cache for the opening
+message of a conversation only (follow-ups like "can you summarize our chat?" depend
+on that conversation). Questions under `min_words` words are never cached or served.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+import numpy as np
+
+
+class Embedder(Protocol):
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """float32 array of shape (len(texts), dim), rows L2-normalized."""
+        ...
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Words and character trigrams hashed into `dim` signed buckets (stable across restarts).
+
+    The same code as HashingEmbedder in decodingopenaisdk/vector_memory.py. This project
+    ships on its own (see pyproject.toml), so it keeps its copy; change both together.
+    """
+
+    def __init__(self, dim: int = 512, char_ngram: int = 3):
+        self.dim = dim
+        self.char_ngram = char_ngram
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        n = self.char_ngram
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+@dataclass
+class CacheHit:
+    entry_id: int
+    question: str
+    answer: str
+    score: float
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        threshold: float = 0.92,
+        ttl: float = 3600.0,
+        max_entries: int = 10_000,
+        min_words: int = 3,
+    ):
+        self.embedder: Embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_words = min_words
+
+        capacity = min(max_entries, 256)
+        self._vectors = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        self._expires = np.zeros(capacity, dtype=np.float64)  # 0 = free slot
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._questions: list[str | None] = [None] * capacity
+        self._answers: list[str | None] = [None] * capacity
+        self._used = 0  # slots [0, _used) have been handed out at least once
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires[: self._used] > time.time()))
+
+    def cacheable(self, question: str) -> bool:
+        return len(_WORD_RE.findall(question)) >= self.min_words
+
+    def _best(self, vector: np.ndarray) -> tuple[int, float]:
+        if self._used == 0:
+            return -1, 0.0
+        scores = self._vectors[: self._used] @ vector
+        scores[self._expires[: self._used] <= time.time()] = -np.inf  # expired or invalidated
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    def lookup(self, question: str) -> CacheHit | None:
+        if not self.cacheable(question):
+            return None
+        best, score = self._best(self.embedder.embed([question])[0])
+        if best < 0 or score < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CacheHit(best, self._questions[best], self._answers[best], score)
+
+    def _free_slot(self) -> int:
+        now = time.time()
+        free = np.flatnonzero(self._expires[: self._used] <= now)
+        if free.size:
+            return int(free[0])
+        if self._used < self._vectors.shape[0]:
+            self._used += 1
+            return self._used - 1
+        if self._used < self.max_entries:
+            capacity = min(self.max_entries, self._vectors.shape[0] * 2)
+            extra = capacity - self._vectors.shape[0]
+            self._vectors = np.vstack([self._vectors, np.zeros((extra, self.embedder.dim), dtype=np.float32)])
+            self._expires = np.concatenate([self._expires, np.zeros(extra)])
+            self._created = np.concatenate([self._created, np.zeros(extra)])
+            self._questions.extend([None] * extra)
+            self._answers.extend([None] * extra)
+            self._used += 1
+            return self._used - 1
+        return int(np.argmin(self._created[: self._used]))  # full: evict the oldest
+
+    def store(self, question: str, answer: str, ttl: float | None = None) -> int | None:
+        """Cache an answer; a near-duplicate question already cached is replaced. Returns the entry id."""
+        if not self.cacheable(question):
+            return None
+        vector = self.embedder.embed([question])[0]
+        best, score = self._best(vector)
+        slot = best if best >= 0 and score >= self.threshold else self._free_slot()
+        now = time.time()
+        self._vectors[slot] = vector
+        self._expires[slot] = now + (self.ttl if ttl is None else ttl)
+        self._created[slot] = now
+        self._questions[slot] = question
+        self._answers[slot] = answer
+        return slot
+
+    def invalidate(self, entry_id: int):
+        self._expires[entry_id] = 0.0
+        self._questions[entry_id] = self._answers[entry_id] = None
+
+    def invalidate_matching(self, question: str) -> int | None:
+        """Drop the entry a question would hit (e.g. after the answer turned out wrong)."""
+        best, score = self._best(self.embedder.embed([question])[0])
+        if best < 0 or score < self.threshold:
+            return None
+        self.invalidate(best)
+        return best
+
+    def clear(self):
+        self._expires[:] = 0.0
+        self._questions = [None] * len(self._questions)
+        self._answers = [None] * len(self._answers)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# 🧪 Near-duplicate questions: python semantic_cache.py
+if __name__ == "__main__":
+    cache = SemanticCache()
+    cache.store("What is an AI agent?", "An AI agent is a model that can use tools to act.")
+    cache.store("How do I install chainlit?", "Run `uv add chainlit`.")
+
+    for question in [
+        "what is an ai agent",
+        "WHAT IS AN AI AGENT?!",
+        "an AI agent is what?",
+        "how do i install Chainlit",
+        "How do I uninstall chainlit?",
+        "What is the weather today?",
+    ]:
+        hit = cache.lookup(question)
+        print(f"{question!r:35} -> {f'HIT {hit.score:.2f}' if hit else 'miss'}")
+
+    cache.invalidate_matching("what is an AI agent")
+    assert cache.lookup("What is an AI agent?") is None
+    print(cache.stats())
@@ -0,0 +1,93 @@
+"""
+Per-session agent runs for the Chainlit app.
+
+Every chat session has at most ONE agent run in flight:
+- a new message from the same user cancels the older run (RunSuperseded is raised there)
+- stop / disconnect cancels the run for that session only
+- runs are plain asyncio tasks, so many sessions progress in parallel on one event loop
+
+Run `python session_runs.py` to see N sessions overlapping instead of queueing.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Awaitable
+
+
+class RunSuperseded(Exception):
+    """The run was cancelled because a newer message arrived in the same session."""
+
+
+class SessionRuns:
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._superseded: weakref.WeakSet[asyncio.Task] = weakref.WeakSet()
+
+    def active(self) -> int:
+        return sum(not task.done() for task in self._tasks.values())
+
+    async def run(self, session_id: str, work: Awaitable[Any]) -> Any:
+        """Run `work` as this session's current run and return its result."""
+        previous = self._tasks.get(session_id)
+        if previous is not None and not previous.done():
+            self._superseded.add(previous)
+            previous.cancel()
+
+        task = asyncio.ensure_future(work)
+        self._tasks[session_id] = task
+        try:
+            # If the caller itself is cancelled (disconnect), awaiting cancels `task` too
+            return await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if task in self._superseded and not (current and current.cancelling()):
+                raise RunSuperseded() from None
+            raise
+        finally:
+            if self._tasks.get(session_id) is task:
+                del self._tasks[session_id]
+
+    def cancel(self, session_id: str) -> bool:
+        """Cancel the session's run, if any (used on stop and chat end)."""
+        task = self._tasks.pop(session_id, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+
+# 🧪 Concurrency check: python session_runs.py
+if __name__ == "__main__":
+    import time
+
+    SESSIONS = 50
+    MODEL_LATENCY = 0.5  # seconds per simulated model round trip
+
+    async def fake_model_call(session: int, turn: int) -> str:
+        await asyncio.sleep(MODEL_LATENCY)  # like `await Runner.run(...)`: yields the loop
+        return f"session {session} turn {turn} done"
+
+    async def chat(runs: SessionRuns, session: int, turns: int = 3):
+        for turn in range(turns):
+            await runs.run(f"s{session}", fake_model_call(session, turn))
+
+    async def main():
+        runs = SessionRuns()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(chat(runs, i) for i in range(SESSIONS)))
+        elapsed = time.perf_counter() - started
+        serial = SESSIONS * 3 * MODEL_LATENCY
+        print(f"{SESSIONS} sessions x 3 turns: {elapsed:.2f}s (blocking run_sync would take ~{serial:.0f}s)")
+        assert elapsed < serial / 10, "sessions did not progress in parallel"
+
+        # A newer message in the same session cancels the older run
+        first = asyncio.create_task(runs.run("s0", asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        second = await runs.run("s0", fake_model_call(0, 99))
+        try:
+            await first
+        except RunSuperseded:
+            print("older run superseded ->", second)
+
+    asyncio.run(main())
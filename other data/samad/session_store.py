@@ -0,0 +1,430 @@
+"""
+Externalized chat session storage.
+
+`cl.user_session` lives in one worker's memory: sessions die with the worker and a
+load balancer cannot send the next message to another process. Session state
+(the compacted history) lives in a SessionStore instead:
+
+- InMemorySessionStore: single process, for development
+- SQLiteSessionStore:   one file shared by the workers on one host, survives restarts
+- RedisSessionStore:    any Redis-protocol server shared by many hosts
+  (LocalRespServer is a tiny in-process stand-in for trying it without Redis)
+
+ChatSession adds two things on top:
+- lazy loading: history is fetched on the first message, not on connect
+- write-behind: updates mark the session dirty and are flushed after `flush_delay`,
+  so several updates per turn cost one write
+
+Pick a backend with SESSION_STORE_URL: memory://, sqlite:///sessions.db, redis://host:6379/0
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+from urllib.parse import urlparse
+
+from history_compaction import CompactedHistory
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    async def load(self, session_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def save(self, session_id: str, record: dict[str, Any]): ...
+
+    @abstractmethod
+    async def delete(self, session_id: str): ...
+
+    async def close(self):
+        pass
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _decode(data: bytes | None) -> dict[str, Any] | None:
+    return None if data is None else json.loads(data)
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self):
+        self._data: dict[str, bytes] = {}  # stored encoded, so callers never share objects
+
+    async def load(self, session_id: str) -> dict[str, Any] | None:
+        return _decode(self._data.get(session_id))
+
+    async def save(self, session_id: str, record: dict[str, Any]):
+        self._data[session_id] = _encode(record)
+
+    async def delete(self, session_id: str):
+        self._data.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite in WAL mode; blocking calls run in a worker thread, never on the event loop."""
+
+    def __init__(self, path: str = "sessions.db"):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _execute(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def load(self, session_id: str) -> dict[str, Any] | None:
+        rows = await asyncio.to_thread(self._execute, "SELECT data FROM sessions WHERE id = ?", (session_id,))
+        return _decode(rows[0][0]) if rows else None
+
+    async def save(self, session_id: str, record: dict[str, Any]):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO sessions (id, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (session_id, _encode(record), time.time()),
+        )
+
+    async def delete(self, session_id: str):
+        await asyncio.to_thread(self._execute, "DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RedisSessionStore(SessionStore):
+    """Minimal RESP2 client (GET/SET/DEL) over one asyncio connection; no extra dependency."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: str | None = None, prefix: str = "chat:", ttl: int | None = 7 * 24 * 3600):
+        self.host, self.port, self.db, self.password = host, port, db, password
+        self.prefix = prefix
+        self.ttl = ttl
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()  # one request/reply at a time on the connection
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+
+    async def _roundtrip(self, *args: str | bytes) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else arg.encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await _read_reply(self._reader)
+
+    def _drop(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def command(self, *args: str | bytes) -> Any:
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self._connect()
+                try:
+                    return await self._roundtrip(*args)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # Reconnect once (server restart, idle timeout)
+                    self._drop()
+                    await self._connect()
+                    return await self._roundtrip(*args)
+            except RespError:
+                raise  # the whole error reply was read: the connection is still in sync
+            except BaseException:
+                # Cancelled or failed mid-command: its reply may still be unread and would
+                # be taken as the answer to the next command, so start over on a new connection
+                self._drop()
+                raise
+
+    async def load(self, session_id: str) -> dict[str, Any] | None:
+        return _decode(await self.command("GET", self.prefix + session_id))
+
+    async def save(self, session_id: str, record: dict[str, Any]):
+        args = ["SET", self.prefix + session_id, _encode(record)]
+        if self.ttl:
+            args += ["EX", str(self.ttl)]
+        await self.command(*args)
+
+    async def delete(self, session_id: str):
+        await self.command("DEL", self.prefix + session_id)
+
+    async def close(self):
+        if self._writer is not None:
+            writer = self._writer
+            self._drop()
+            await writer.wait_closed()
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2]
+    if kind == b"*":
+        size = int(body)
+        return None if size < 0 else [await _read_reply(reader) for _ in range(size)]
+    raise RespError(f"Unexpected reply: {line!r}")
+
+
+class LocalRespServer:
+    """
+    In-process Redis stand-in (PING, GET, SET [EX], DEL, EXISTS, FLUSHALL).
+    For local runs and checks only; data is lost when it stops.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host, self.port = host, port
+        self._data: dict[bytes, tuple[bytes, float | None]] = {}
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self) -> "LocalRespServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _get(self, key: bytes) -> bytes | None:
+        value = self._data.get(key)
+        if value is None:
+            return None
+        data, expires = value
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        return data
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await _read_reply(reader)
+                writer.write(self._dispatch(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _dispatch(self, args: list[bytes]) -> bytes:
+        name = args[0].upper()
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"GET":
+            data = self._get(args[1])
+            return b"$-1\r\n" if data is None else b"$%d\r\n%s\r\n" % (len(data), data)
+        if name == b"SET":
+            expires = None
+            if len(args) >= 5 and args[3].upper() == b"EX":
+                expires = time.monotonic() + int(args[4])
+            self._data[args[1]] = (args[2], expires)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            removed = sum(self._data.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % removed
+        if name == b"EXISTS":
+            return b":%d\r\n" % sum(self._get(key) is not None for key in args[1:])
+        if name == b"FLUSHALL":
+            self._data.clear()
+            return b"+OK\r\n"
+        if name in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name
+
+
+def open_store(url: str = "memory://") -> SessionStore:
+    """memory://, sqlite:///relative.db, sqlite:////absolute/path.db or redis://[:password@]host:port/db"""
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return InMemorySessionStore()
+    if parsed.scheme == "sqlite":
+        # sqlite:///rel.db is relative, sqlite:////abs/path.db is absolute
+        return SQLiteSessionStore(parsed.path[1:] or "sessions.db")
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisSessionStore(parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password)
+    raise ValueError(f"Unsupported session store URL: {url}")
+
+
+# =============================================================================
+# Lazy, write-behind session
+# =============================================================================
+
+
+class ChatSession:
+    def __init__(self, store: SessionStore, session_id: str, flush_delay: float = 1.0):
+        self.store = store
+        self.session_id = session_id
+        self.flush_delay = flush_delay
+        self._state: CompactedHistory | None = None
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+
+    async def load(self) -> CompactedHistory:
+        """History is fetched from the store on first use only."""
+        if self._state is None:
+            record = await self.store.load(self.session_id) or {}
+            self._state = CompactedHistory(record.get("summary"), record.get("recent", []))
+        return self._state
+
+    def update(self, state: CompactedHistory):
+        """Record a new state; the write happens later, batched with any further updates."""
+        self._state = state
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self, max_delay: float = 30.0):
+        # A failed write is logged and retried (with backoff) instead of killing the task:
+        # later updates reuse this task, so they would otherwise never be saved
+        delay = self.flush_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                return
+            except Exception:
+                delay = min(max(delay, 0.1) * 2, max_delay)
+                logger.exception("Saving session %s failed; retrying in %.1fs", self.session_id, delay)
+
+    async def flush(self):
+        if not self._dirty or self._state is None:
+            return
+        self._dirty = False  # updates arriving during the write mark it dirty again
+        try:
+            await self.store.save(self.session_id, {"summary": self._state.summary, "recent": self._state.recent})
+        except BaseException:  # cancelled too: the write may not have happened
+            self._dirty = True
+            raise
+
+    async def close(self):
+        """Flush immediately (chat end / shutdown)."""
+        task = self._flush_task
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.wait([task])  # let a cancelled in-flight save mark the state dirty again
+        await self.flush()
+
+
+# 🧪 Round trip through every backend: python session_store.py
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    async def check(store: SessionStore, label: str):
+        writer = ChatSession(store, "thread-1", flush_delay=0.05)
+        state = await writer.load()
+        for turn in range(3):  # three updates, one write
+            state = CompactedHistory(f"summary {turn}", state.recent + [{"role": "user", "content": f"hi {turn}"}])
+            writer.update(state)
+        await asyncio.sleep(0.1)
+
+        reader = ChatSession(store, "thread-1")  # e.g. another worker after a restart
+        loaded = await reader.load()
+        assert loaded.summary == "summary 2" and len(loaded.recent) == 3, loaded
+        await store.delete("thread-1")
+        assert await store.load("thread-1") is None
+        print(f"{label}: ok")
+
+    async def main():
+        await check(InMemorySessionStore(), "memory")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"))
+            await check(sqlite_store, "sqlite")
+            await sqlite_store.close()
+
+        # A failing backend: the write-behind task logs, retries and saves once it recovers
+        class FlakyStore(InMemorySessionStore):
+            failures = 2
+
+            async def save(self, session_id: str, record: dict[str, Any]):
+                if self.failures:
+                    self.failures -= 1
+                    raise ConnectionError("backend unavailable")
+                await super().save(session_id, record)
+
+        logging.basicConfig(level=logging.CRITICAL)  # the expected retry tracebacks
+        flaky = FlakyStore()
+        session = ChatSession(flaky, "thread-1", flush_delay=0.01)
+        session.update(CompactedHistory("after retries", []))
+        await asyncio.sleep(1.0)  # retries after 0.2 s and 0.4 s
+        assert (await flaky.load("thread-1"))["summary"] == "after retries"
+        print("write-behind retry: ok")
+
+        # close() while the write-behind save is in flight: the last state is still written
+        class SlowStore(InMemorySessionStore):
+            async def save(self, session_id: str, record: dict[str, Any]):
+                await asyncio.sleep(0.2)
+                await super().save(session_id, record)
+
+        slow = SlowStore()
+        session = ChatSession(slow, "thread-1", flush_delay=0.01)
+        session.update(CompactedHistory("last turn", []))
+        await asyncio.sleep(0.05)  # the save has started
+        await session.close()
+        assert (await slow.load("thread-1"))["summary"] == "last turn"
+        print("close during an in-flight save: ok")
+
+        for url, path in (("sqlite:///rel.db", "rel.db"), ("sqlite:////var/data/s.db", "/var/data/s.db")):
+            assert urlparse(url).path[1:] == path, url
+
+        server = await LocalRespServer().start()
+        redis_store = RedisSessionStore(port=server.port)
+        await check(redis_store, "redis-protocol")
+
+        # A command cancelled after sending must not leave its reply for the next one
+        await redis_store.command("SET", "key", "value")
+        cancelled = asyncio.create_task(redis_store.command("SET", "other", "x"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.wait([cancelled])
+        assert await redis_store.command("GET", "key") == b"value"
+        print("cancelled command, connection reset: ok")
+        await redis_store.close()
+        await server.stop()
+
+    asyncio.run(main())
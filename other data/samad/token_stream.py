@@ -0,0 +1,102 @@
+"""
+Token streaming helpers for the Chainlit app.
+
+Sending every model delta as its own websocket frame floods the browser with tiny
+updates. TokenCoalescer batches deltas and flushes when either:
+- the batch reaches `max_chars`, or
+- `max_delay` seconds passed since the last flush (a timer covers pauses in the stream)
+
+The FIRST delta is flushed immediately, so the user sees text as early as possible.
+Time-to-first-token (TTFT) is recorded per message, since it is the latency users notice.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+
+@dataclass
+class StreamStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: float | None = None
+    finished_at: float | None = None
+    deltas: int = 0
+    frames: int = 0
+    chars: int = 0
+
+    @property
+    def ttft_ms(self) -> float | None:
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started_at) * 1000
+
+    @property
+    def total_ms(self) -> float | None:
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at) * 1000
+
+
+class TokenCoalescer:
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        max_delay: float = 0.05,
+        max_chars: int = 48,
+        stats: StreamStats | None = None,
+    ):
+        self._send = send
+        self.max_delay = max_delay
+        self.max_chars = max_chars
+        self.stats = stats or StreamStats()
+        self._buffer: list[str] = []
+        self._buffered_chars = 0
+        self._last_flush = 0.0
+        self._timer: asyncio.Task | None = None
+        self._lock = asyncio.Lock()  # keeps frames in order when the timer and push() race
+
+    async def push(self, delta: str):
+        if not delta:
+            return
+        now = time.perf_counter()
+        if self.stats.first_token_at is None:
+            self.stats.first_token_at = now
+        self.stats.deltas += 1
+        self.stats.chars += len(delta)
+        self._buffer.append(delta)
+        self._buffered_chars += len(delta)
+
+        if (
+            self.stats.frames == 0
+            or self._buffered_chars >= self.max_chars
+            or now - self._last_flush >= self.max_delay
+        ):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later(self.max_delay - (now - self._last_flush)))
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._buffered_chars = 0
+            self._last_flush = time.perf_counter()
+            self.stats.frames += 1
+            await self._send(text)
+
+    async def close(self) -> StreamStats:
+        """Flush whatever is left and finish the stats."""
+        await self.flush()
+        self.stats.finished_at = time.perf_counter()
+        return self.stats